@@ -1,20 +1,39 @@
 """KitchenOwl integration for Home Assistant."""
 
+from datetime import timedelta
+from functools import partial
 import logging
 
 from kitchenowl_python.exceptions import KitchenOwlAuthException, KitchenOwlException
 from kitchenowl_python.kitchenowl import KitchenOwl
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import CONF_ACCESS_TOKEN, CONF_HOST, CONF_VERIFY_SSL, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 
-from .const import CONF_HOUSEHOLD, DOMAIN
+from .connection import KitchenOwlConnection
+from .const import (
+    CONF_HOUSEHOLD,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_RECENT_ITEMS_LIMIT,
+    CONF_RECENT_ITEMS_MAX_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    SESSION_EXTRA_CONNECTIONS,
+    STORAGE_VERSION,
+)
 from .coordinator import KitchenOwlDataUpdateCoordinator
+from .offline import offline_queue_store
+from .resilience import ResilientKitchenOwl
+from .session import async_create_session
 
-PLATFORMS: list[Platform] = [Platform.TODO]
+PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.TODO]
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,12 +43,144 @@ type KitchenOwlConfigEntry = ConfigEntry[KitchenOwlDataUpdateCoordinator]
 async def async_setup_entry(hass: HomeAssistant, config: KitchenOwlConfigEntry) -> bool:
     """Set up the Kitchenowl component from config entry."""
 
-    host = config.data[CONF_HOST]
-    token = config.data[CONF_ACCESS_TOKEN]
-    verify_ssl = config.data.get(CONF_VERIFY_SSL, True)
-    session = async_get_clientsession(hass, verify_ssl=verify_ssl)
+    connection = _async_get_connection(hass, config)
+    kitchenowl = connection.kitchenowl
+
+    coordinator = KitchenOwlDataUpdateCoordinator(
+        hass,
+        kitchenowl,
+        config.data[CONF_HOUSEHOLD],
+        request_semaphore=connection.request_semaphore,
+        scheduler=connection.scheduler,
+        session_statistics=connection.session_statistics,
+        min_scan_interval=config.options.get(
+            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+        ),
+        max_scan_interval=config.options.get(
+            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+        ),
+        recent_items_limit=config.options.get(CONF_RECENT_ITEMS_LIMIT),
+        recent_items_max_age=timedelta(days=max_age)
+        if (max_age := config.options.get(CONF_RECENT_ITEMS_MAX_AGE)) is not None
+        else None,
+    )
+    # Unload callbacks run last in, first out
+    config.async_on_unload(
+        partial(_async_release_connection, hass, config, coordinator)
+    )
+    config.async_on_unload(connection.async_add_coordinator(coordinator))
+    await coordinator.async_load_offline_queue()
+    if await coordinator.async_load_snapshot():
+        # Set up the entities with the stored data right away, the server is
+        # validated and refetched in the background
+        config.async_create_background_task(
+            hass,
+            _async_validate_and_refresh(hass, config, coordinator),
+            "kitchenowl_startup_refresh",
+        )
+    else:
+        await _async_validate_connection(kitchenowl, config.data[CONF_HOUSEHOLD])
+        await coordinator.async_config_entry_first_refresh()
+
+    config.runtime_data = coordinator
+
+    await hass.config_entries.async_forward_entry_setups(config, PLATFORMS)
+
+    config.async_on_unload(config.add_update_listener(async_update_options))
+
+    return True
+
+
+def _connection_key(config: ConfigEntry) -> tuple[str, str]:
+    return config.data[CONF_HOST].rstrip("/"), config.data[CONF_ACCESS_TOKEN]
+
+
+@callback
+def _async_shared_entries(
+    hass: HomeAssistant, config: ConfigEntry
+) -> list[ConfigEntry]:
+    """Return the entries sharing a connection with the entry, the entry included."""
+
+    key = _connection_key(config)
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(
+            DOMAIN, include_ignore=False, include_disabled=False
+        )
+        if _connection_key(entry) == key
+    ]
+
+
+@callback
+def _async_max_concurrent_requests(hass: HomeAssistant, config: ConfigEntry) -> int:
+    """Return the highest request limit of the entries sharing a connection."""
+
+    return max(
+        entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, MAX_CONCURRENT_REQUESTS)
+        for entry in _async_shared_entries(hass, config)
+    )
+
+
+@callback
+def _async_get_connection(
+    hass: HomeAssistant, config: ConfigEntry
+) -> KitchenOwlConnection:
+    """Return the connection shared by the entries of a server and user."""
+
+    connections: dict[tuple[str, str], KitchenOwlConnection] = hass.data.setdefault(
+        DOMAIN, {}
+    )
+    key = _connection_key(config)
+    if (connection := connections.get(key)) is None:
+        host, token = config.data[CONF_HOST], config.data[CONF_ACCESS_TOKEN]
+        max_concurrent_requests = _async_max_concurrent_requests(hass, config)
+        session, session_statistics, remove_session_close_listener = (
+            async_create_session(
+                hass,
+                config.data.get(CONF_VERIFY_SSL, True),
+                max(1, max_concurrent_requests) + SESSION_EXTRA_CONNECTIONS,
+            )
+        )
+        connection = connections[key] = KitchenOwlConnection(
+            hass,
+            session,
+            session_statistics,
+            remove_session_close_listener,
+            ResilientKitchenOwl(KitchenOwl(session, host, token)),
+            host,
+            token,
+            max_concurrent_requests,
+        )
+    return connection
+
+
+async def _async_release_connection(
+    hass: HomeAssistant,
+    config: ConfigEntry,
+    coordinator: KitchenOwlDataUpdateCoordinator,
+) -> None:
+    """Close the connection and its session once no entry uses it anymore.
+
+    The coordinator is shut down first, so the changes it still has to send
+    are sent before the session is closed. The unload callbacks run
+    concurrently, the order they are registered in is not enough.
+    """
+
+    try:
+        await coordinator.async_shutdown()
+    finally:
+        connections: dict[tuple[str, str], KitchenOwlConnection] = hass.data[DOMAIN]
+        key = _connection_key(config)
+        if (connection := connections.get(key)) is not None and not connection.in_use:
+            del connections[key]
+            await connection.async_close()
+
+
+async def _async_validate_connection(
+    kitchenowl: ResilientKitchenOwl, household_id: str | None
+) -> None:
+    """Test the connection and that the household is available."""
 
-    kitchenowl = KitchenOwl(session, host, token)
     try:
         await kitchenowl.test_connection()
         households = await kitchenowl.get_households()
@@ -38,14 +189,14 @@ async def async_setup_entry(hass: HomeAssistant, config: KitchenOwlConfigEntry)
                 translation_domain=DOMAIN,
                 translation_key="no_households_found_exception",
             )
-        if config.data[CONF_HOUSEHOLD] is None or config.data[CONF_HOUSEHOLD] not in (
+        if household_id is None or household_id not in (
             str(h["id"]) for h in households
         ):
             raise ConfigEntryNotReady(
                 translation_domain=DOMAIN,
                 translation_key="household_not_in_households_list_exception",
                 translation_placeholders={
-                    "household": config.data[CONF_HOUSEHOLD],
+                    "household": household_id,
                 },
             )
 
@@ -56,18 +207,65 @@ async def async_setup_entry(hass: HomeAssistant, config: KitchenOwlConfigEntry)
     except KitchenOwlException as e:
         raise ConfigEntryNotReady from e
 
-    coordinator = KitchenOwlDataUpdateCoordinator(
-        hass, kitchenowl, config.data[CONF_HOUSEHOLD]
-    )
-    await coordinator.async_config_entry_first_refresh()
 
-    config.runtime_data = coordinator
+async def _async_validate_and_refresh(
+    hass: HomeAssistant,
+    config: KitchenOwlConfigEntry,
+    coordinator: KitchenOwlDataUpdateCoordinator,
+) -> None:
+    """Validate the connection and replace the stored data with live data."""
 
-    await hass.config_entries.async_forward_entry_setups(config, PLATFORMS)
+    try:
+        await _async_validate_connection(
+            coordinator.kitchenowl, config.data[CONF_HOUSEHOLD]
+        )
+    except ConfigEntryAuthFailed:
+        config.async_start_reauth(hass)
+        return
+    except ConfigEntryNotReady as e:
+        # Keep showing the stored data, polling retries until the server
+        # is reachable again
+        _LOGGER.warning("Unable to connect to KitchenOwl, using stored data: %s", e)
+        return
+    await coordinator.async_refresh()
 
-    return True
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when the options changed.
+
+    If the highest request limit of the entries sharing its connection
+    changed, all of them are reloaded together, so the connection is created
+    again with the new limit.
+    """
+
+    connection: KitchenOwlConnection | None = hass.data[DOMAIN].get(
+        _connection_key(entry)
+    )
+    if (
+        connection is None
+        or connection.max_concurrent_requests
+        == _async_max_concurrent_requests(hass, entry)
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    loaded = [
+        shared
+        for shared in _async_shared_entries(hass, entry)
+        if shared.state is ConfigEntryState.LOADED
+    ]
+    for shared in loaded:
+        await hass.config_entries.async_unload(shared.entry_id)
+    for shared in loaded:
+        await hass.config_entries.async_setup(shared.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+    await offline_queue_store(hass, entry.entry_id).async_remove()
@@ -0,0 +1,140 @@
+"""Batching of shopping list mutations sent to KitchenOwl."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import BATCH_DELAY, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Operation:
+    """A request waiting to be sent, with everyone waiting for its result."""
+
+    request: Callable[[], Awaitable[Any]]
+    futures: list[asyncio.Future[Any]] = field(default_factory=list)
+
+
+class MutationBatcher:
+    """Collect mutations for a short time and send them as one batch.
+
+    Mutations are grouped by list and target, e.g. an item id. The requests
+    of a group are sent in the order they were submitted, while the groups
+    are sent concurrently, limited by the semaphore. Submitting an operation
+    of the same kind for the same target again before the batch is sent
+    replaces the earlier request, so rapid repeated edits of an item only
+    send the last one.
+
+    After a batch that sent several requests for a list, or in which a
+    request failed, ``on_list_done`` is called once for that list.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        semaphore: asyncio.Semaphore,
+        on_list_done: Callable[[int], Awaitable[None]],
+    ) -> None:
+        """Initialise the batcher."""
+
+        self._hass = hass
+        self._semaphore = semaphore
+        self._on_list_done = on_list_done
+        self._pending: dict[tuple[int, Hashable], dict[str, _Operation]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_submit(
+        self,
+        list_id: int,
+        target: Hashable,
+        kind: str,
+        request: Callable[[], Awaitable[Any]],
+    ) -> asyncio.Future[Any]:
+        """Queue a request and return a future for its result."""
+
+        future: asyncio.Future[Any] = self._hass.loop.create_future()
+        operations = self._pending.setdefault((list_id, target), {})
+        if (operation := operations.get(kind)) is not None:
+            # Coalesce with the queued request, the last submitted one wins
+            operation.request = request
+        else:
+            operation = operations[kind] = _Operation(request)
+        operation.futures.append(future)
+
+        if self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_later(
+                BATCH_DELAY, self._async_schedule_flush
+            )
+        return future
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        self._flush_handle = None
+        self._hass.async_create_background_task(
+            self.async_flush(), name=f"{DOMAIN}_mutation_batch"
+        )
+
+    async def async_flush(self) -> None:
+        """Send all queued requests now."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        results = await asyncio.gather(
+            *(
+                self._async_send_group(list(operations.values()))
+                for operations in pending.values()
+            )
+        )
+
+        sent: dict[int, int] = {}
+        failed: set[int] = set()
+        for (list_id, _), (count, ok) in zip(pending, results, strict=True):
+            sent[list_id] = sent.get(list_id, 0) + count
+            if not ok:
+                failed.add(list_id)
+        _LOGGER.debug("Sent a batch of %d KitchenOwl mutations", sum(sent.values()))
+
+        await asyncio.gather(
+            *(
+                self._on_list_done(list_id)
+                for list_id, count in sent.items()
+                if count > 1 or list_id in failed
+            )
+        )
+
+    async def _async_send_group(self, operations: list[_Operation]) -> tuple[int, bool]:
+        """Send the requests of a group in order.
+
+        Return the number of requests sent and whether all succeeded. The
+        requests after a failed one are not sent, as they may depend on it.
+        """
+
+        for sent, operation in enumerate(operations, 1):
+            if all(future.done() for future in operation.futures):
+                # Nobody waits for it anymore, e.g. a cancelled replay
+                continue
+            try:
+                async with self._semaphore:
+                    result = await operation.request()
+            except Exception as e:  # noqa: BLE001
+                for remaining in operations[sent - 1 :]:
+                    for future in remaining.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                return sent, False
+            for future in operation.futures:
+                if not future.done():
+                    future.set_result(result)
+        return len(operations), True
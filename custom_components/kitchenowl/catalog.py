@@ -0,0 +1,180 @@
+"""Search index over the items known in a KitchenOwl household."""
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING
+
+from .const import CATALOG_FUZZY_CANDIDATES, CATALOG_FUZZY_CUTOFF
+
+if TYPE_CHECKING:
+    from .coordinator import ShoppingListData
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_FUZZY = "fuzzy"
+
+
+def normalize_name(name: str) -> str:
+    """Return the key of an item name, ignoring case and extra whitespace."""
+    return " ".join(name.casefold().split())
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogMatch:
+    """An item of the catalog that matches a search."""
+
+    name: str
+    item_id: int
+    match: str
+    score: float
+
+
+class ItemCatalog:
+    """Index the names of the items and recent items of all lists.
+
+    KitchenOwl adds items by name, so a name that differs from an existing
+    item only in case or spacing creates a near-duplicate. The catalog finds
+    the existing item for a name without asking the server, and searches
+    the items by exact name, by the prefix of the name or of one of its
+    words, and by fuzzy matching over a trigram index.
+
+    The index is updated incrementally from the coordinator data, only the
+    lists whose data was replaced since the last search are indexed again.
+    """
+
+    def __init__(self) -> None:
+        """Initialise an empty catalog."""
+
+        self._lists: dict[int, tuple[ShoppingListData, dict[str, tuple[str, int]]]] = {}
+        # key -> (name, item id) and the number of lists the item is on
+        self._entries: dict[str, tuple[str, int]] = {}
+        self._references: Counter[str] = Counter()
+        self._trigram_index: dict[str, set[str]] = {}
+        # Sorted (word, key) pairs for prefix searches, built when needed
+        self._words: list[tuple[str, str]] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of distinct item names."""
+        return len(self._entries)
+
+    def update(self, data: Mapping[int, "ShoppingListData"] | None) -> None:
+        """Index the lists that changed since the last update."""
+
+        data = data or {}
+        for list_id in self._lists.keys() - data.keys():
+            self._remove_names(self._lists.pop(list_id)[1])
+        for list_id, list_data in data.items():
+            indexed = self._lists.get(list_id)
+            if indexed is not None and indexed[0] is list_data:
+                continue
+            names = {
+                normalize_name(item.name): (item.name, item.id)
+                for items in (list_data["recent_items"], list_data["items"])
+                for item in items
+                # Items not created on the server yet have no id to offer
+                if item.id >= 0
+            }
+            if indexed is not None:
+                self._remove_names(indexed[1])
+            self._add_names(names)
+            self._lists[list_id] = (list_data, names)
+
+    def _add_names(self, names: dict[str, tuple[str, int]]) -> None:
+        for key, entry in names.items():
+            self._references[key] += 1
+            if key in self._entries:
+                continue
+            self._entries[key] = entry
+            for trigram in _trigrams(key):
+                self._trigram_index.setdefault(trigram, set()).add(key)
+            self._words = None
+
+    def _remove_names(self, names: dict[str, tuple[str, int]]) -> None:
+        for key in names:
+            self._references[key] -= 1
+            if self._references[key] > 0:
+                continue
+            del self._references[key]
+            del self._entries[key]
+            for trigram in _trigrams(key):
+                keys = self._trigram_index[trigram]
+                keys.discard(key)
+                if not keys:
+                    del self._trigram_index[trigram]
+            self._words = None
+
+    def _match(self, key: str, match: str, score: float) -> CatalogMatch:
+        name, item_id = self._entries[key]
+        return CatalogMatch(name, item_id, match, score)
+
+    def search(self, query: str, limit: int = 10) -> list[CatalogMatch]:
+        """Return the items best matching the query, best first."""
+
+        key = normalize_name(query)
+        if not key or limit < 1:
+            return []
+        matches: dict[str, CatalogMatch] = {}
+        if key in self._entries:
+            matches[key] = self._match(key, MATCH_EXACT, 1.0)
+
+        if self._words is None:
+            self._words = sorted(
+                (word, entry_key)
+                for entry_key in self._entries
+                for word in {entry_key, *entry_key.split()}
+            )
+        start = bisect_left(self._words, (key, ""))
+        for word, entry_key in self._words[start:]:
+            if len(matches) >= limit or not word.startswith(key):
+                break
+            if entry_key not in matches:
+                matches[entry_key] = self._match(
+                    entry_key, MATCH_PREFIX, len(key) / len(entry_key)
+                )
+
+        if len(matches) < limit:
+            for entry_key, score in self._fuzzy_matches(key):
+                if entry_key not in matches:
+                    matches[entry_key] = self._match(entry_key, MATCH_FUZZY, score)
+                if len(matches) >= limit:
+                    break
+        return list(matches.values())[:limit]
+
+    def _fuzzy_matches(self, key: str) -> list[tuple[str, float]]:
+        """Return the keys similar to the key with their similarity, best first.
+
+        The trigram index narrows the catalog down to the keys sharing most
+        trigrams with the key, only those are compared in full.
+        """
+
+        shared: Counter[str] = Counter()
+        for trigram in _trigrams(key):
+            shared.update(self._trigram_index.get(trigram, ()))
+        matcher = SequenceMatcher(b=key, autojunk=False)
+        scored = []
+        for candidate, _ in shared.most_common(CATALOG_FUZZY_CANDIDATES):
+            matcher.set_seq1(candidate)
+            if (score := matcher.ratio()) >= CATALOG_FUZZY_CUTOFF:
+                scored.append((candidate, score))
+        scored.sort(key=lambda match: match[1], reverse=True)
+        return scored
+
+    def resolve(self, name: str) -> CatalogMatch | None:
+        """Return the existing item a name refers to, ignoring case and spacing.
+
+        Names are not resolved by fuzzy matching, a close name may well be a
+        different product, e.g. "Goat milk" and "Oat milk".
+        """
+
+        key = normalize_name(name)
+        if key in self._entries:
+            return self._match(key, MATCH_EXACT, 1.0)
+        return None
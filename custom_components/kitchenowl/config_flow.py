@@ -3,6 +3,7 @@
 import logging
 from typing import Any
 
+import aiohttp
 from kitchenowl_python.exceptions import (
     KitchenOwlAuthException,
     KitchenOwlRequestException,
@@ -12,8 +13,11 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_ACCESS_TOKEN, CONF_HOST, CONF_VERIFY_SSL
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.selector import (
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
     SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
@@ -23,7 +27,19 @@ from homeassistant.helpers.selector import (
 )
 
 from . import KitchenOwlConfigEntry
-from .const import CONF_HOUSEHOLD, DOMAIN
+from .const import (
+    CONF_HOUSEHOLD,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_RECENT_ITEMS_LIMIT,
+    CONF_RECENT_ITEMS_MAX_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+)
+from .session import async_create_session
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
@@ -62,17 +78,53 @@ class KitchenowlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         self.data: dict[str, Any] = {}
         self.kitchenowl: KitchenOwl | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._remove_session_close_listener: CALLBACK_TYPE | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: KitchenOwlConfigEntry,
+    ) -> "KitchenOwlOptionsFlow":
+        """Get the options flow for this handler."""
+        return KitchenOwlOptionsFlow()
 
     async def setup_connection(self, host, token, verify_ssl) -> KitchenOwl:
         """Set up and test the connection to the KitchenOwl instance."""
 
-        session = async_get_clientsession(self.hass, verify_ssl=verify_ssl)
-        kitchenowl = KitchenOwl(session, host, token)
+        # A submit may change verify_ssl, so the session of the previous
+        # submit is replaced
+        if (session := self._async_detach_session()) is not None:
+            await session.close()
+        # The flow sends one request at a time
+        self._session, _, self._remove_session_close_listener = async_create_session(
+            self.hass, verify_ssl, 1
+        )
+        kitchenowl = KitchenOwl(self._session, host, token)
 
         await kitchenowl.test_connection()
 
         return kitchenowl
 
+    @callback
+    def async_remove(self) -> None:
+        """Close the session of the flow."""
+
+        if (session := self._async_detach_session()) is not None:
+            self.hass.async_create_background_task(
+                session.close(), name=f"{DOMAIN}_close_flow_session"
+            )
+
+    @callback
+    def _async_detach_session(self) -> aiohttp.ClientSession | None:
+        """Return the session of the flow to be closed and forget it."""
+
+        if self._remove_session_close_listener is not None:
+            self._remove_session_close_listener()
+            self._remove_session_close_listener = None
+        session, self._session = self._session, None
+        return session
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
         """Invoke when a user initiates a flow via the user interface."""
 
@@ -283,3 +335,90 @@ class KitchenowlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=step_reconfigure_user_data_schema,
             errors=errors,
         )
+
+
+def _seconds_selector() -> vol.All:
+    return vol.All(
+        NumberSelector(
+            NumberSelectorConfig(
+                min=10,
+                max=86400,
+                step=1,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Coerce(int),
+    )
+
+
+def _count_selector(minimum: int, maximum: int, unit: str | None = None) -> vol.All:
+    config = NumberSelectorConfig(
+        min=minimum, max=maximum, step=1, mode=NumberSelectorMode.BOX
+    )
+    if unit is not None:
+        config["unit_of_measurement"] = unit
+    return vol.All(NumberSelector(config), vol.Coerce(int))
+
+
+class KitchenOwlOptionsFlow(config_entries.OptionsFlow):
+    """KitchenOwl options flow."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        """Manage the polling and recent items options."""
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "min_above_max_scan_interval"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        step_init_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=options.get(
+                        CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                    ),
+                ): _seconds_selector(),
+                vol.Required(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                    ),
+                ): _seconds_selector(),
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(
+                        CONF_MAX_CONCURRENT_REQUESTS, MAX_CONCURRENT_REQUESTS
+                    ),
+                ): vol.All(
+                    NumberSelector(
+                        NumberSelectorConfig(
+                            min=1, max=32, step=1, mode=NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Coerce(int),
+                ),
+                # Left empty, all recent items are shown
+                vol.Optional(
+                    CONF_RECENT_ITEMS_LIMIT,
+                    description={
+                        "suggested_value": options.get(CONF_RECENT_ITEMS_LIMIT)
+                    },
+                ): _count_selector(0, 10000),
+                vol.Optional(
+                    CONF_RECENT_ITEMS_MAX_AGE,
+                    description={
+                        "suggested_value": options.get(CONF_RECENT_ITEMS_MAX_AGE)
+                    },
+                ): _count_selector(1, 3650, "d"),
+            }
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=step_init_schema,
+            errors=errors,
+        )
@@ -0,0 +1,173 @@
+"""Connection to a KitchenOwl server shared by the config entries of a user."""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from functools import partial
+import logging
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, REFRESH_MERGE_WINDOW
+from .push import KitchenOwlPushClient
+from .resilience import ResilientKitchenOwl
+from .session import SessionStatistics
+
+if TYPE_CHECKING:
+    from .coordinator import KitchenOwlDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+type RefreshJob = Callable[[], Coroutine[Any, Any, None]]
+
+
+class RefreshScheduler:
+    """Run the scheduled refreshes of several coordinators from one timer.
+
+    Refreshes that are due within ``REFRESH_MERGE_WINDOW`` seconds of the
+    earliest one are run together, so the households of a server are polled
+    in one burst sharing the request limit instead of in separate loops.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise the scheduler."""
+
+        self._hass = hass
+        self._jobs: dict[object, tuple[float, RefreshJob]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_schedule(
+        self, key: object, delay: float, job: RefreshJob
+    ) -> CALLBACK_TYPE:
+        """Run the job after the delay, replacing a scheduled job of the key.
+
+        Return a callback that cancels the job.
+        """
+
+        entry = (self._hass.loop.time() + delay, job)
+        self._jobs[key] = entry
+        self._async_reschedule()
+        return partial(self._async_cancel, key, entry)
+
+    @callback
+    def _async_cancel(self, key: object, entry: tuple[float, RefreshJob]) -> None:
+        if self._jobs.get(key) is entry:
+            del self._jobs[key]
+            self._async_reschedule()
+
+    @callback
+    def _async_reschedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._jobs:
+            self._timer = self._hass.loop.call_at(
+                min(when for when, _ in self._jobs.values()), self._async_run_due
+            )
+
+    @callback
+    def _async_run_due(self) -> None:
+        self._timer = None
+        deadline = min(when for when, _ in self._jobs.values()) + REFRESH_MERGE_WINDOW
+        due = [key for key, (when, _) in self._jobs.items() if when <= deadline]
+        _LOGGER.debug("Running %d scheduled KitchenOwl refreshes", len(due))
+        for key in due:
+            _, job = self._jobs.pop(key)
+            self._hass.async_create_background_task(
+                job(), name=f"{DOMAIN}_scheduled_refresh"
+            )
+        self._async_reschedule()
+
+
+class KitchenOwlConnection:
+    """The session, client, request limit, scheduler and push client of a user.
+
+    Config entries for different households of the same user share one
+    connection, which is closed when the last of them is unloaded.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        session_statistics: SessionStatistics,
+        remove_session_close_listener: CALLBACK_TYPE,
+        kitchenowl: ResilientKitchenOwl,
+        host: str,
+        token: str,
+        max_concurrent_requests: int,
+    ) -> None:
+        """Initialise the connection."""
+
+        self.session = session
+        self.session_statistics = session_statistics
+        self._remove_session_close_listener = remove_session_close_listener
+        self.kitchenowl = kitchenowl
+        self.push_client = KitchenOwlPushClient(
+            session,
+            host,
+            token,
+            self.async_handle_push_event,
+            self.async_set_push_connected,
+        )
+        self.max_concurrent_requests = max_concurrent_requests
+        self.request_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+        self.scheduler = RefreshScheduler(hass)
+        self._hass = hass
+        self._coordinators: set[KitchenOwlDataUpdateCoordinator] = set()
+        self._push_task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_add_coordinator(
+        self, coordinator: "KitchenOwlDataUpdateCoordinator"
+    ) -> CALLBACK_TYPE:
+        """Share the connection with a coordinator.
+
+        Return a callback that removes the coordinator again.
+        """
+
+        self._coordinators.add(coordinator)
+        if self._push_task is None:
+            self._push_task = self._hass.async_create_background_task(
+                self.push_client.async_run(), name=f"{DOMAIN}_push_client"
+            )
+        elif self.push_client.connected:
+            coordinator.async_set_push_connected(True)
+        return partial(self._async_remove_coordinator, coordinator)
+
+    @callback
+    def _async_remove_coordinator(
+        self, coordinator: "KitchenOwlDataUpdateCoordinator"
+    ) -> None:
+        self._coordinators.discard(coordinator)
+
+    @property
+    def in_use(self) -> bool:
+        """Return True while any coordinator uses the connection."""
+        return bool(self._coordinators)
+
+    async def async_close(self) -> None:
+        """Stop receiving push updates and close the session."""
+
+        if self._push_task is not None:
+            self._push_task.cancel()
+            self._push_task = None
+        self._remove_session_close_listener()
+        await self.session.close()
+
+    @callback
+    def async_handle_push_event(self, event: str, payload: dict[str, Any]) -> None:
+        """Pass a push event on to the coordinators of all households."""
+
+        for coordinator in list(self._coordinators):
+            coordinator.async_handle_push_event(event, payload)
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        """Pass a change of the push connection on to all coordinators."""
+
+        for coordinator in list(self._coordinators):
+            coordinator.async_set_push_connected(connected)
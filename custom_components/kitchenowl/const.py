@@ -1,5 +1,82 @@
 """Constants."""
 
+from datetime import timedelta
+
 DOMAIN = "kitchenowl"
 CONF_HOUSEHOLD = "household"
-SCAN_INTERVAL = 60
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_RECENT_ITEMS_LIMIT = "recent_items_limit"
+CONF_RECENT_ITEMS_MAX_AGE = "recent_items_max_age"
+SERVICE_ADD_ITEMS = "add_items"
+SERVICE_LOAD_RECENT_ITEMS = "load_recent_items"
+SERVICE_SEARCH_ITEMS = "search_items"
+ATTR_ITEMS = "items"
+ATTR_COUNT = "count"
+ATTR_QUERY = "query"
+ATTR_LIMIT = "limit"
+EVENT_ITEM_CHANGED = "kitchenowl_item_changed"
+
+# Polling interval bounds in seconds. Polling runs at the minimum interval
+# while the lists are in use and backs off towards the maximum while they are
+# idle. While realtime push updates are received, polling only serves as a
+# safety net and always runs at the maximum interval.
+DEFAULT_MIN_SCAN_INTERVAL = 30
+DEFAULT_MAX_SCAN_INTERVAL = 900
+# Time in seconds after a change during which the lists count as in use
+ACTIVITY_PERIOD = 300
+# Factor by which the polling interval grows with every idle refresh
+SCAN_INTERVAL_BACKOFF = 1.5
+# Maximum number of shopping list requests in flight at the same time
+# during a refresh. 1 fetches the lists one after another.
+MAX_CONCURRENT_REQUESTS = 4
+# A shopping list that fails to refresh on its own keeps its last data and
+# is retried with a growing delay between these bounds in seconds. It is
+# shown as unavailable once its data is older than STALE_LIST_MAX_AGE.
+LIST_RETRY_MIN_DELAY = 15
+LIST_RETRY_MAX_DELAY = 300
+STALE_LIST_MAX_AGE = timedelta(minutes=30)
+# Scheduled refreshes of households on the same server that are due within
+# this many seconds of each other are run together
+REFRESH_MERGE_WINDOW = 5
+# Requests that fail because the server is unreachable are retried this many
+# times, with a random delay of up to RETRY_BASE_DELAY * 2 ** attempt seconds
+# but at most RETRY_MAX_DELAY
+REQUEST_RETRIES = 2
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 5
+# Timeout in seconds of requests without an endpoint specific timeout
+DEFAULT_REQUEST_TIMEOUT = 20
+# HTTP session of a server. It holds a connection for each concurrent
+# request and SESSION_EXTRA_CONNECTIONS for the push connection and the
+# requests outside the request limit. Idle connections are kept open for
+# SESSION_KEEPALIVE_TIMEOUT seconds and the server is resolved at most every
+# SESSION_DNS_CACHE_TTL seconds.
+SESSION_EXTRA_CONNECTIONS = 2
+SESSION_KEEPALIVE_TIMEOUT = 60
+SESSION_DNS_CACHE_TTL = 300
+# Timeout in seconds to open a connection to the server
+SESSION_CONNECT_TIMEOUT = 10
+# Requests are paused for CIRCUIT_RESET_TIMEOUT seconds after this many
+# failed in a row. The pause doubles up to CIRCUIT_MAX_RESET_TIMEOUT while
+# the server stays unreachable.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+CIRCUIT_MAX_RESET_TIMEOUT = 300
+# Time in seconds mutations are collected before they are sent as a batch
+BATCH_DELAY = 0.5
+# Storage of the last good coordinator data, used to set up the entities
+# before the server was reached
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+# Queued changes are stored quickly, they are lost on a restart otherwise
+OFFLINE_QUEUE_SAVE_DELAY = 1
+PUSH_RECONNECT_MIN_DELAY = 5
+PUSH_RECONNECT_MAX_DELAY = 300
+
+# Item catalog search. Fuzzy matches need at least CATALOG_FUZZY_CUTOFF
+# similarity, only the CATALOG_FUZZY_CANDIDATES names sharing most trigrams
+# with the query are compared.
+CATALOG_FUZZY_CUTOFF = 0.6
+CATALOG_FUZZY_CANDIDATES = 50
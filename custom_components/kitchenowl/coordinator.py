@@ -1,28 +1,360 @@
 """Data Update Coordinator for the KitchenOwl integration."""
 
-from datetime import timedelta
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from functools import partial
+import itertools
 import logging
-from typing import TypedDict
+import time
+from typing import TYPE_CHECKING, Any, TypedDict, cast
 
 from kitchenowl_python.exceptions import (
     KitchenOwlAuthException,
     KitchenOwlException,
     KitchenOwlRequestException,
 )
-from kitchenowl_python.kitchenowl import KitchenOwl
-from kitchenowl_python.types import KitchenOwlShoppingList, KitchenOwlShoppingListItem
+from kitchenowl_python.types import (
+    KitchenOwlItem,
+    KitchenOwlShoppingList,
+    KitchenOwlShoppingListItem,
+)
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, SCAN_INTERVAL
+from .batch import MutationBatcher
+from .catalog import CatalogMatch, ItemCatalog
+from .connection import RefreshScheduler
+from .const import (
+    ACTIVITY_PERIOD,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DOMAIN,
+    EVENT_ITEM_CHANGED,
+    LIST_RETRY_MAX_DELAY,
+    LIST_RETRY_MIN_DELAY,
+    MAX_CONCURRENT_REQUESTS,
+    SCAN_INTERVAL_BACKOFF,
+    SNAPSHOT_SAVE_DELAY,
+    STALE_LIST_MAX_AGE,
+    STORAGE_VERSION,
+)
+from .diff import ItemChange, diff_shopping_list
+from .models import ShoppingListItem
+from .mutations import (
+    ACTION_ADD,
+    ACTION_COMPLETE,
+    ACTION_DELETE,
+    ACTION_DESCRIPTION,
+    ACTION_MOVE,
+    ACTION_RENAME,
+    ACTION_UNCOMPLETE,
+    Mutation,
+    batch_target,
+)
+from .offline import OfflineMutationQueue, offline_queue_store
+from .push import EVENT_SHOPPINGLIST_ITEM_ADD, EVENT_SHOPPINGLIST_ITEM_REMOVE
+from .resilience import ResilientKitchenOwl, is_unreachable
+from .session import SessionStatistics
+from .singleflight import SingleFlight
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fields in which servers that support it send the items and recent items of
+# a shopping list along with the list
+_EMBEDDED_ITEMS = "items"
+_EMBEDDED_RECENT_ITEMS = "recentItems"
+
 
 class ShoppingListData(TypedDict):
     """Data class to conveniently access all shopping list data."""
 
+    shopping_list: KitchenOwlShoppingList
+    items: list[ShoppingListItem]
+    recent_items: list[ShoppingListItem]
+    # id -> (item, completed) for all items and recent items
+    item_index: dict[int, tuple[ShoppingListItem, bool]]
+    # hash over everything that is shown of the list
+    fingerprint: int
+
+
+@dataclass
+class StateWriteStatistics:
+    """Count the state writes of the shopping list entities."""
+
+    written: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class RefreshStatistics:
+    """Time the full refreshes of the shopping lists."""
+
+    refreshes: int = 0
+    failures: int = 0
+    # Duration of the last refresh in seconds
+    last_duration: float | None = None
+    last_success: datetime | None = None
+    last_failure: datetime | None = None
+    # Number of items and recent items the last successful refresh fetched
+    fetched_items: int = 0
+
+
+def build_shopping_list_data(
+    shopping_list: KitchenOwlShoppingList,
+    items: list[ShoppingListItem],
+    recent_items: list[ShoppingListItem],
+) -> ShoppingListData:
+    """Return the list data with the item index built."""
+
+    item_index = {i.id: (i, True) for i in recent_items}
+    item_index.update((i.id, (i, False)) for i in items)
+    return ShoppingListData(
+        shopping_list=shopping_list,
+        items=items,
+        recent_items=recent_items,
+        item_index=item_index,
+        fingerprint=hash(
+            (
+                shopping_list["name"],
+                tuple(items),
+                tuple(recent_items),
+            )
+        ),
+    )
+
+
+def parse_shopping_list_data(
+    shopping_list: KitchenOwlShoppingList,
+    items: Iterable[KitchenOwlShoppingListItem],
+    recent_items: Iterable[KitchenOwlShoppingListItem],
+) -> ShoppingListData:
+    """Return the list data of items in the format of KitchenOwl."""
+
+    return build_shopping_list_data(
+        shopping_list,
+        [ShoppingListItem.from_kitchenowl(i) for i in items],
+        [ShoppingListItem.from_kitchenowl(i) for i in recent_items],
+    )
+
+
+def split_embedded_items(
+    lst: KitchenOwlShoppingList,
+) -> tuple[
+    KitchenOwlShoppingList,
+    tuple[list[KitchenOwlShoppingListItem], list[KitchenOwlShoppingListItem]] | None,
+]:
+    """Return the list without the items sent along with it, and those items.
+
+    The items are None if the server did not send them with the list.
+    """
+
+    shopping_list: dict[str, Any] = dict(lst)
+    items = shopping_list.pop(_EMBEDDED_ITEMS, None)
+    recent_items = shopping_list.pop(_EMBEDDED_RECENT_ITEMS, None)
+    if items is None or recent_items is None:
+        return cast(KitchenOwlShoppingList, shopping_list), None
+    return cast(KitchenOwlShoppingList, shopping_list), (items, recent_items)
+
+
+def limit_recent_items(
+    recent_items: list[KitchenOwlShoppingListItem],
+    limit: int | None,
+    max_age: timedelta | None,
+) -> list[KitchenOwlShoppingListItem]:
+    """Return the most recent items within the count and age limits.
+
+    KitchenOwl returns the most recently used items first. Items without a
+    time of their last change are kept.
+    """
+
+    if max_age is not None:
+        oldest = (dt_util.utcnow() - max_age).timestamp() * 1000
+        recent_items = [
+            i for i in recent_items if i.get("updated_at", oldest) >= oldest
+        ]
+    if limit is not None:
+        recent_items = recent_items[:limit]
+    return recent_items
+
+
+def with_items(
+    list_data: ShoppingListData,
+    items: list[ShoppingListItem],
+    completed: bool,
+) -> ShoppingListData:
+    """Return a copy of the list data with the items put on the list.
+
+    Items with the same ids are replaced. Completed items are put in front of
+    the recent items, like KitchenOwl does.
+    """
+
+    item_ids = {item.id for item in items}
+    new_items = [i for i in list_data["items"] if i.id not in item_ids]
+    recent_items = [i for i in list_data["recent_items"] if i.id not in item_ids]
+    if completed:
+        recent_items[:0] = reversed(items)
+    else:
+        new_items.extend(items)
+    return build_shopping_list_data(list_data["shopping_list"], new_items, recent_items)
+
+
+def with_item(
+    list_data: ShoppingListData, item: ShoppingListItem, completed: bool
+) -> ShoppingListData:
+    """Return a copy of the list data with the item put on the list."""
+    return with_items(list_data, [item], completed)
+
+
+def with_recent_items_limit(
+    list_data: ShoppingListData, limit: int | None
+) -> ShoppingListData:
+    """Return the list data with at most ``limit`` recent items."""
+
+    if limit is None or len(list_data["recent_items"]) <= limit:
+        return list_data
+    return build_shopping_list_data(
+        list_data["shopping_list"],
+        list_data["items"],
+        list_data["recent_items"][:limit],
+    )
+
+
+def without_items(list_data: ShoppingListData, item_ids: set[int]) -> ShoppingListData:
+    """Return a copy of the list data without the given items."""
+
+    return build_shopping_list_data(
+        list_data["shopping_list"],
+        [i for i in list_data["items"] if i.id not in item_ids],
+        [i for i in list_data["recent_items"] if i.id not in item_ids],
+    )
+
+
+def with_orderings(
+    list_data: ShoppingListData, orderings: dict[int, int]
+) -> ShoppingListData:
+    """Return a copy of the list data with the items given new orderings."""
+
+    def reordered(items: list[ShoppingListItem]) -> list[ShoppingListItem]:
+        return [
+            replace(i, ordering=orderings[i.id]) if i.id in orderings else i
+            for i in items
+        ]
+
+    return build_shopping_list_data(
+        list_data["shopping_list"],
+        reordered(list_data["items"]),
+        reordered(list_data["recent_items"]),
+    )
+
+
+def apply_mutation(list_data: ShoppingListData, mutation: Mutation) -> ShoppingListData:
+    """Return a copy of the list data with the mutation applied."""
+
+    action = mutation["action"]
+    item_id = mutation["item_id"]
+    if action == ACTION_DELETE:
+        return without_items(list_data, {item_id})
+    if action == ACTION_MOVE:
+        return with_orderings(list_data, {item_id: mutation["ordering"]})
+
+    current = list_data["item_index"].get(item_id)
+    if current is None:
+        if action != ACTION_ADD:
+            return list_data
+        return with_item(list_data, ShoppingListItem(item_id, mutation["name"]), False)
+
+    item, completed = current
+    if action == ACTION_ADD:
+        return with_item(list_data, item, False)
+    if action == ACTION_RENAME:
+        return with_item(list_data, replace(item, name=mutation["name"]), completed)
+    if action == ACTION_DESCRIPTION:
+        return with_item(
+            list_data, replace(item, description=mutation["description"]), completed
+        )
+    if action == ACTION_UNCOMPLETE:
+        return with_item(
+            list_data,
+            replace(item, name=mutation["name"], description=mutation["description"]),
+            False,
+        )
+    return with_item(list_data, item, True)
+
+
+def apply_mutations(
+    list_data: ShoppingListData, mutations: Iterable[Mutation]
+) -> ShoppingListData:
+    """Return a copy of the list data with the mutations applied in order.
+
+    A move can take several mutations, consecutive ones are applied at once.
+    """
+
+    orderings: dict[int, int] = {}
+    for mutation in mutations:
+        if mutation["action"] == ACTION_MOVE:
+            orderings[mutation["item_id"]] = mutation["ordering"]
+            continue
+        if orderings:
+            list_data = with_orderings(list_data, orderings)
+            orderings = {}
+        list_data = apply_mutation(list_data, mutation)
+    if orderings:
+        list_data = with_orderings(list_data, orderings)
+    return list_data
+
+
+def find_conflict(list_data: ShoppingListData | None, mutation: Mutation) -> str | None:
+    """Return why a stored mutation no longer applies to the server state.
+
+    The server wins: a mutation is dropped if the item was deleted, or if the
+    field it changes was changed on the server since the mutation was made.
+    Mutations that would not change anything are dropped as well.
+    """
+
+    if list_data is None:
+        return "the shopping list was deleted"
+
+    action = mutation["action"]
+    if action == ACTION_ADD:
+        if any(
+            i.name.casefold() == mutation["name"].casefold() for i in list_data["items"]
+        ):
+            return "the item is already on the list"
+        return None
+
+    current = list_data["item_index"].get(mutation["item_id"])
+    if current is None:
+        return "the item was deleted"
+    item, completed = current
+    base = mutation.get("base")
+
+    if action == ACTION_RENAME and base is not None and item.name != base["name"]:
+        return "the item was renamed"
+    if action == ACTION_MOVE and item.name != mutation["name"]:
+        # The name is sent along with the ordering
+        return "the item was renamed"
+    if (
+        action == ACTION_DESCRIPTION
+        and base is not None
+        and item.description != base["description"]
+    ):
+        return "the description was changed"
+    if action == ACTION_COMPLETE and completed:
+        return "the item was already completed"
+    if action == ACTION_UNCOMPLETE and not completed:
+        return "the item is already on the list"
+    return None
+
+
+class ShoppingListSnapshot(TypedDict):
+    """The stored data of a shopping list."""
+
     shopping_list: KitchenOwlShoppingList
     items: list[KitchenOwlShoppingListItem]
     recent_items: list[KitchenOwlShoppingListItem]
@@ -34,11 +366,28 @@ class KitchenOwlDataUpdateCoordinator(
     """Coordinator to manage fetching / updating KitchenOwl data."""
 
     def __init__(
-        self, hass: HomeAssistant, kitchenowl: KitchenOwl, household_id: str
+        self,
+        hass: HomeAssistant,
+        kitchenowl: ResilientKitchenOwl,
+        household_id: str,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        min_scan_interval: int = DEFAULT_MIN_SCAN_INTERVAL,
+        max_scan_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        request_semaphore: asyncio.Semaphore | None = None,
+        scheduler: RefreshScheduler | None = None,
+        recent_items_limit: int | None = None,
+        recent_items_max_age: timedelta | None = None,
+        session_statistics: SessionStatistics | None = None,
     ) -> None:
-        """Initialise the coordinator with Home Asisstant and KitchenOwl."""
+        """Initialise the coordinator with Home Asisstant and KitchenOwl.
 
-        interval = timedelta(seconds=SCAN_INTERVAL)
+        Coordinators of households on the same server can share the request
+        semaphore, a scheduler that runs their polling together and the
+        statistics of the session. Only the most recent items within the
+        count and age limits are kept of the recently used items of each list.
+        """
+
+        interval = timedelta(seconds=min_scan_interval)
         super().__init__(
             hass,
             _LOGGER,
@@ -47,8 +396,119 @@ class KitchenOwlDataUpdateCoordinator(
         )
         self.kitchenowl = kitchenowl
         self._household_id = household_id
+        self._request_semaphore = request_semaphore or asyncio.Semaphore(
+            max(1, max_concurrent_requests)
+        )
+        self._scheduler = scheduler
+        self._list_listeners: dict[int, set[CALLBACK_TYPE]] = {}
+        self.batcher = MutationBatcher(
+            hass, self._request_semaphore, self.async_refresh_list
+        )
+        self.state_writes = StateWriteStatistics()
+        self.refresh_statistics = RefreshStatistics()
+        self.session_statistics = session_statistics
+        self.push_connected = False
+        # Items created locally get a negative id until the server assigned one
+        self._local_ids = itertools.count(-1, -1)
+        self._push_connected_before = False
+        self._min_scan_interval = timedelta(seconds=min_scan_interval)
+        self._max_scan_interval = timedelta(
+            seconds=max(min_scan_interval, max_scan_interval)
+        )
+        self._last_activity = time.monotonic()
+        self._store: Store[dict[str, list[ShoppingListSnapshot]]] | None = None
+        if self.config_entry is not None:
+            self._store = Store(
+                hass, STORAGE_VERSION, f"{DOMAIN}.{self.config_entry.entry_id}"
+            )
+        self.offline_queue = OfflineMutationQueue(
+            offline_queue_store(hass, self.config_entry.entry_id)
+            if self.config_entry is not None
+            else None
+        )
+        # The lists as last fetched or pushed, without the queued mutations
+        # applied
+        self._server_data: dict[int, ShoppingListData] = {}
+        self._pending_adds: dict[int, asyncio.Future[KitchenOwlShoppingListItem]] = {}
+        self._server_ids: dict[int, int] = {}
+        self._replay_task: asyncio.Task[None] | None = None
+        # Tasks sending the changes made locally
+        self._mutation_tasks: set[asyncio.Task[None]] = set()
+        # Lists whose last refresh failed, with the time of the first failure
+        self.stale_since: dict[int, datetime] = {}
+        self._list_retries: dict[int, CALLBACK_TYPE] = {}
+        self._list_retry_delays: dict[int, float] = {}
+        self._recent_items_limit = recent_items_limit
+        self._recent_items_max_age = recent_items_max_age
+        # Lists for which more recent items were loaded on demand, with their
+        # raised count limit or None if all of them were loaded
+        self._recent_items_loaded: dict[int, int | None] = {}
+        self.catalog = ItemCatalog()
+        # Whether the server sends the items along with the lists, so that a
+        # refresh of the household is a single request, detected from the
+        # first lists fetched
+        self.bulk_refresh: bool | None = None
+        # Refreshes running at the same time share their fetches
+        self._refreshes: SingleFlight[dict[int, ShoppingListData]] = SingleFlight(hass)
+        self._list_refreshes: SingleFlight[None] = SingleFlight(hass)
+        # Number of refreshes running that need the lists read after they
+        # were requested, see async_refresh_after_changes
+        self._fresh_refreshes = 0
+        # The lists as item changes were last published for, and the changes
+        # published last for each list with the states they are between
+        self._published: dict[int, ShoppingListData] | None = None
+        self._published_changes: dict[
+            int, tuple[ShoppingListData, ShoppingListData, list[ItemChange]]
+        ] = {}
 
     async def _async_update_data(self) -> dict[int, ShoppingListData]:
+        # Polls join a fetch that is already running
+        return await self._refreshes.async_run(
+            None, self._async_timed_fetch_lists, self._fresh_refreshes > 0
+        )
+
+    async def async_refresh_after_changes(self) -> None:
+        """Refresh all lists with data read after the call.
+
+        Unlike a poll it does not join a fetch that started before, so the
+        changes sent before are seen.
+        """
+
+        self._fresh_refreshes += 1
+        try:
+            await self.async_refresh()
+        finally:
+            self._fresh_refreshes -= 1
+
+    @property
+    def coalesced_refreshes(self) -> int:
+        """Return the number of refreshes served by the fetch of another one."""
+        return self._refreshes.joined + self._list_refreshes.joined
+
+    async def _async_timed_fetch_lists(self) -> dict[int, ShoppingListData]:
+        """Fetch all shopping lists and record the refresh statistics."""
+
+        statistics = self.refresh_statistics
+        statistics.refreshes += 1
+        start = time.monotonic()
+        try:
+            data = await self._async_fetch_lists()
+        except Exception:
+            statistics.failures += 1
+            statistics.last_duration = time.monotonic() - start
+            statistics.last_failure = dt_util.utcnow()
+            raise
+        statistics.last_duration = time.monotonic() - start
+        statistics.last_success = dt_util.utcnow()
+        statistics.fetched_items = sum(
+            len(list_data["items"]) + len(list_data["recent_items"])
+            for list_data in self._server_data.values()
+        )
+        return data
+
+    async def _async_fetch_lists(self) -> dict[int, ShoppingListData]:
+        """Fetch all shopping lists of the household."""
+
         try:
             lists_response = await self.kitchenowl.get_shoppinglists(self._household_id)
         except KitchenOwlAuthException as e:
@@ -60,23 +520,766 @@ class KitchenOwlDataUpdateCoordinator(
         except KitchenOwlException as e:
             raise UpdateFailed("Unable to get kitchenowl data") from e
 
+        if self.bulk_refresh is None and lists_response:
+            self.bulk_refresh = all(
+                split_embedded_items(lst)[1] is not None for lst in lists_response
+            )
+            _LOGGER.debug(
+                "KitchenOwl %s the items along with the shopping lists, "
+                "bulk refresh %s",
+                "sends" if self.bulk_refresh else "does not send",
+                "enabled" if self.bulk_refresh else "disabled",
+            )
+        results = await asyncio.gather(
+            *(self._async_fetch_list(lst) for lst in lists_response),
+            return_exceptions=True,
+        )
+
+        changed = self.data is None or self.data.keys() != {
+            lst["id"] for lst in lists_response
+        }
+        server_data: dict[int, ShoppingListData] = {}
         list_data: dict[int, ShoppingListData] = {}
-        for lst in lists_response:
-            try:
-                items = await self.kitchenowl.get_shoppinglist_items(lst["id"])
-                recent_items = await self.kitchenowl.get_shoppinglist_recent_items(
-                    lst["id"]
+        for lst, result in zip(lists_response, results, strict=True):
+            list_id = lst["id"]
+            previous = self.data.get(list_id) if self.data else None
+            if isinstance(result, (KitchenOwlException, TimeoutError)):
+                # Keep the last good data of a list that failed on its own,
+                # it is retried separately
+                if previous is None or isinstance(result, KitchenOwlAuthException):
+                    raise UpdateFailed("Unable to get kitchenowl data") from result
+                self._async_mark_list_stale(list_id, result)
+                server_data[list_id] = self._server_data.get(list_id, previous)
+                list_data[list_id] = previous
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            self._async_mark_list_fresh(list_id)
+            server_data[list_id] = result
+            result = self._with_queued_mutations(list_id, result)
+            # Keep unchanged lists identical, so entities can tell they did
+            # not change without comparing them again
+            if (
+                previous is not None
+                and previous["fingerprint"] == result["fingerprint"]
+            ):
+                result = previous
+            else:
+                changed = True
+            list_data[list_id] = result
+
+        self._server_data = server_data
+        if self.data is not None:
+            for list_id in self.data.keys() - list_data.keys():
+                self._async_forget_list(list_id)
+        if changed:
+            self._last_activity = time.monotonic()
+            self._async_schedule_snapshot()
+        self._adapt_update_interval()
+        if self.offline_queue.active and (
+            self._replay_task is None or self._replay_task.done()
+        ):
+            # The server is reachable again
+            self._replay_task = self.hass.async_create_background_task(
+                self._async_replay_offline_queue(), name=f"{DOMAIN}_offline_replay"
+            )
+        return list_data
+
+    async def async_load_offline_queue(self) -> None:
+        """Load the mutations that were queued before a restart."""
+
+        await self.offline_queue.async_load()
+        # Do not hand out the local ids of queued items again
+        lowest_id = min((m["item_id"] for m in self.offline_queue.mutations), default=0)
+        self._local_ids = itertools.count(min(lowest_id, 0) - 1, -1)
+
+    def _with_queued_mutations(
+        self, list_id: int, list_data: ShoppingListData
+    ) -> ShoppingListData:
+        """Return the list data with the queued mutations applied."""
+
+        return apply_mutations(
+            list_data,
+            (m for m in self.offline_queue.mutations if m["list_id"] == list_id),
+        )
+
+    async def async_load_snapshot(self) -> bool:
+        """Use the last stored data until the server is reached.
+
+        Return True if a snapshot was found.
+        """
+
+        if self._store is None or not (stored := await self._store.async_load()):
+            return False
+        self.data = {
+            lst["shopping_list"]["id"]: self._with_queued_mutations(
+                lst["shopping_list"]["id"],
+                parse_shopping_list_data(
+                    lst["shopping_list"], lst["items"], lst["recent_items"]
+                ),
+            )
+            for lst in stored["lists"]
+        }
+        return True
+
+    @callback
+    def _async_schedule_snapshot(self) -> None:
+        """Store the current data after a short delay."""
+
+        if self._store is not None:
+            self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _snapshot(self) -> dict[str, list[ShoppingListSnapshot]]:
+        return {
+            "lists": [
+                ShoppingListSnapshot(
+                    shopping_list=list_data["shopping_list"],
+                    # Items that are not created on the server yet are left out
+                    items=[i.as_dict() for i in list_data["items"] if i.id >= 0],
+                    recent_items=[
+                        i.as_dict() for i in list_data["recent_items"] if i.id >= 0
+                    ],
                 )
-            except KitchenOwlAuthException as e:
-                raise UpdateFailed("Unable to get kitchenowl data") from e
-            except TimeoutError as e:
-                raise UpdateFailed("Unable to get kitchenowl data") from e
-            except KitchenOwlRequestException as e:
-                raise UpdateFailed("Unable to get kitchenowl data") from e
-            except KitchenOwlException as e:
-                raise UpdateFailed("Unable to get kitchenowl data") from e
+                for list_data in self.data.values()
+            ]
+        }
+
+    async def _async_fetch_list(self, lst: KitchenOwlShoppingList) -> ShoppingListData:
+        """Fetch the items and recent items of a single shopping list.
+
+        Both requests are issued together, limited by the coordinator's
+        request semaphore. The recent items are not requested if none are
+        shown.
+
+        With bulk refresh the items the server sent along with the list are
+        used instead, unless more recent items than the server sends with
+        the list were loaded for it.
+        """
+
+        lst, embedded = split_embedded_items(lst)
+        list_id = lst["id"]
+        limit, max_age = self._recent_items_limits(list_id)
+        if (
+            list_id not in self._recent_items_loaded
+            and self.bulk_refresh
+            and embedded is not None
+        ):
+            items, recent_items = embedded
+            return parse_shopping_list_data(
+                lst, items, limit_recent_items(recent_items, limit, max_age)
+            )
+        if limit == 0:
+            # The recent items are not shown at all
+            items = await self._async_limited(
+                self.kitchenowl.get_shoppinglist_items, list_id
+            )
+            return parse_shopping_list_data(lst, items, [])
+
+        items, recent_items = await asyncio.gather(
+            self._async_limited(self.kitchenowl.get_shoppinglist_items, list_id),
+            self._async_limited(self.kitchenowl.get_shoppinglist_recent_items, list_id),
+        )
+        return parse_shopping_list_data(
+            lst, items, limit_recent_items(recent_items, limit, max_age)
+        )
+
+    def _recent_items_limits(self, list_id: int) -> tuple[int | None, timedelta | None]:
+        """Return the count and age limits of the recent items of a list."""
+
+        if list_id in self._recent_items_loaded:
+            return self._recent_items_loaded[list_id], None
+        return self._recent_items_limit, self._recent_items_max_age
+
+    async def async_load_recent_items(self, list_id: int, count: int | None) -> None:
+        """Show ``count`` more recent items of a list, or all of them if None.
+
+        The limits stay raised for the list until the entry is reloaded.
+        """
+
+        if self.data is None or list_id not in self.data:
+            return
+        if count is None or self._recent_items_loaded.get(list_id, 0) is None:
+            self._recent_items_loaded[list_id] = None
+        else:
+            self._recent_items_loaded[list_id] = (
+                len(self.data[list_id]["recent_items"]) + count
+            )
+        await self.async_refresh_list(list_id)
+
+    async def _async_limited[_T](
+        self, request: Callable[..., Awaitable[_T]], *args: Any
+    ) -> _T:
+        """Send a request once a slot of the request semaphore is free."""
+
+        async with self._request_semaphore:
+            return await request(*args)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Publish the item changes and update all listeners.
+
+        The skipped state writes are reported as well.
+        """
+
+        if self.data is not None:
+            self._async_publish_changes(self.data.keys() | (self._published or {}))
+        written = self.state_writes.written
+        skipped = self.state_writes.skipped
+        super().async_update_listeners()
+        _LOGGER.debug(
+            "Updated KitchenOwl household %s: %d state writes, %d skipped as "
+            "unchanged (%d of %d skipped in total)",
+            self._household_id,
+            self.state_writes.written - written,
+            self.state_writes.skipped - skipped,
+            self.state_writes.skipped,
+            self.state_writes.written + self.state_writes.skipped,
+        )
+
+    @callback
+    def _async_publish_changes(self, list_ids: Iterable[int]) -> None:
+        """Fire an event for each item change since the lists were published.
+
+        Lists that were added or removed as a whole have no item changes,
+        nor do items that were not created on the server yet. Changes shown
+        before the server has the same state of the item are pending.
+        """
+
+        if self._published is None:
+            # Nothing was shown before
+            self._published = dict(self.data)
+            return
+        for list_id in list_ids:
+            old = self._published.get(list_id)
+            new = self.data.get(list_id)
+            if new is None:
+                self._published.pop(list_id, None)
+                self._published_changes.pop(list_id, None)
+                continue
+            self._published[list_id] = new
+            if old is None or old is new:
+                continue
+            changes = diff_shopping_list(list_id, old, new)
+            self._published_changes[list_id] = (old, new, changes)
+            server = self._server_data.get(list_id)
+            server_index = server["item_index"] if server is not None else {}
+            for change in changes:
+                if change.item_id < 0:
+                    continue
+                self.hass.bus.async_fire(
+                    EVENT_ITEM_CHANGED,
+                    {
+                        "config_entry_id": self.config_entry.entry_id
+                        if self.config_entry
+                        else None,
+                        "household_id": self._household_id,
+                        **change.as_event_data(),
+                        # Changed locally, the server did not confirm it yet
+                        "pending": new["item_index"].get(change.item_id)
+                        != server_index.get(change.item_id),
+                    },
+                )
+
+    @callback
+    def async_list_changes(
+        self, list_id: int, old: ShoppingListData, new: ShoppingListData
+    ) -> list[ItemChange]:
+        """Return the item changes between two states of a list.
+
+        The changes published last are reused if they are between the same
+        states, which they usually are for the entities.
+        """
+
+        published = self._published_changes.get(list_id)
+        if published is not None and published[0] is old and published[1] is new:
+            return published[2]
+        return diff_shopping_list(list_id, old, new)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh, with the shared scheduler if there is one."""
+
+        if self._scheduler is None:
+            super()._schedule_refresh()
+            return
+        if self.update_interval is None or (
+            self.config_entry and self.config_entry.pref_disable_polling
+        ):
+            return
+        self._async_unsub_refresh()
+        self._unsub_refresh = self._scheduler.async_schedule(
+            self, self.update_interval.total_seconds(), self._handle_refresh_interval
+        )
+
+    def _adapt_update_interval(self) -> None:
+        """Poll fast while the lists are in use and back off while idle."""
+
+        if self.push_connected:
+            self.update_interval = self._max_scan_interval
+        elif time.monotonic() - self._last_activity < ACTIVITY_PERIOD:
+            self.update_interval = self._min_scan_interval
+        else:
+            self.update_interval = min(
+                (self.update_interval or self._min_scan_interval)
+                * SCAN_INTERVAL_BACKOFF,
+                self._max_scan_interval,
+            )
+
+    @callback
+    def async_note_activity(self) -> None:
+        """Switch to fast polling after a change to one of the lists."""
+
+        self._last_activity = time.monotonic()
+        if not self.push_connected and self.update_interval != self._min_scan_interval:
+            self.update_interval = self._min_scan_interval
+            if self._listeners:
+                self._schedule_refresh()
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        """Slow down polling while realtime push updates are received."""
+
+        self.push_connected = connected
+        if not connected:
+            self._last_activity = time.monotonic()
+        self._adapt_update_interval()
+        if self._listeners:
+            self._schedule_refresh()
+        if connected:
+            # Events may have been missed while the connection was down
+            if self._push_connected_before:
+                self.hass.async_create_task(self.async_request_refresh())
+            self._push_connected_before = True
+
+    @callback
+    def async_handle_push_event(self, event: str, payload: dict[str, Any]) -> None:
+        """Apply a realtime shopping list event to the coordinator data."""
+
+        if event not in (EVENT_SHOPPINGLIST_ITEM_ADD, EVENT_SHOPPINGLIST_ITEM_REMOVE):
+            return
+        shopping_list = payload.get("shoppinglist")
+        item = payload.get("item")
+        if (
+            self.data is None
+            or not isinstance(shopping_list, dict)
+            or not isinstance(item, dict)
+            or "id" not in item
+            or "name" not in item
+        ):
+            return
+
+        list_data = self.data.get(shopping_list.get("id"))
+        if list_data is None:
+            # The event may be about a list of this household that is not
+            # known yet; other households share the connection.
+            if str(shopping_list.get("household_id")) == str(self._household_id):
+                self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        list_id = shopping_list["id"]
+        changed_item = ShoppingListItem.from_kitchenowl(item)
+        removed = event == EVENT_SHOPPINGLIST_ITEM_REMOVE
+        # The item was just changed, so it is within the age limit; older
+        # recent items are dropped by the next poll
+        limit, _ = self._recent_items_limits(list_id)
+        if (server_data := self._server_data.get(list_id)) is not None:
+            # The event is the state of the server
+            self._server_data[list_id] = with_recent_items_limit(
+                with_item(server_data, changed_item, removed), limit
+            )
+        self.async_set_list_data(
+            list_id,
+            with_recent_items_limit(with_item(list_data, changed_item, removed), limit),
+        )
+
+    @callback
+    def async_search_items(self, query: str, limit: int) -> list[CatalogMatch]:
+        """Search the items known on all lists of the household."""
+
+        self.catalog.update(self.data)
+        return self.catalog.search(query, limit)
+
+    @callback
+    def async_resolve_item_name(self, name: str) -> str:
+        """Return the name of the existing item a new item name refers to.
+
+        Only case and spacing are ignored, the name is returned as it is if
+        there is no such item.
+        """
+
+        self.catalog.update(self.data)
+        match = self.catalog.resolve(name)
+        if match is None:
+            return name
+        if match.name != name:
+            _LOGGER.debug("Adding existing KitchenOwl item %s for %s", match.name, name)
+        return match.name
+
+    def next_local_id(self) -> int:
+        """Return a temporary id for an item that is not known to the server."""
+        return next(self._local_ids)
+
+    @callback
+    def async_add_list_listener(
+        self, list_id: int, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for changes to a single shopping list.
+
+        Unlike the coordinator listeners, these are only called when the data
+        of that list was replaced on its own, e.g. by a targeted refresh.
+        """
+
+        self._list_listeners.setdefault(list_id, set()).add(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._list_listeners[list_id].discard(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_list_listeners(self, list_id: int) -> None:
+        """Notify the listeners of a single shopping list."""
+
+        for update_callback in list(self._list_listeners.get(list_id, ())):
+            update_callback()
+
+    @callback
+    def async_set_list_data(self, list_id: int, list_data: ShoppingListData) -> None:
+        """Replace the data of a single shopping list and notify its listeners."""
+
+        self.data = {**self.data, list_id: list_data}
+        self._async_publish_changes((list_id,))
+        self.async_update_list_listeners(list_id)
+        self._async_schedule_snapshot()
+
+    async def async_refresh_list(self, list_id: int, fresh: bool = True) -> None:
+        """Refetch a single shopping list and merge it into the data.
+
+        Refreshes of the list at the same time share one fetch. Unless
+        ``fresh`` is False, e.g. for retries, the list is read after the
+        call, so the result of a mutation sent before is seen.
+        """
+
+        if self.data is None or list_id not in self.data:
+            return
+        await self._list_refreshes.async_run(
+            list_id, partial(self._async_refresh_list, list_id), fresh
+        )
+
+    async def _async_refresh_list(self, list_id: int) -> None:
+        if self.data is None or list_id not in self.data:
+            return
+        try:
+            list_data = await self._async_fetch_list(
+                self.data[list_id]["shopping_list"]
+            )
+        except (KitchenOwlException, TimeoutError) as e:
+            if list_id in self.data:
+                self._async_mark_list_stale(list_id, e)
+            return
+        # The list may have been removed by a full refresh in the meantime
+        if list_id in self.data:
+            self._async_mark_list_fresh(list_id)
+            self._server_data[list_id] = list_data
+            self.async_set_list_data(
+                list_id, self._with_queued_mutations(list_id, list_data)
+            )
+
+    @callback
+    def async_list_available(self, list_id: int) -> bool:
+        """Return True if recent data of the list is known.
+
+        A list that failed to refresh on its own stays available with its
+        last good data for a while.
+        """
+
+        if not self.last_update_success:
+            return False
+        stale_since = self.stale_since.get(list_id)
+        return (
+            stale_since is None or dt_util.utcnow() - stale_since < STALE_LIST_MAX_AGE
+        )
+
+    @callback
+    def _async_mark_list_stale(self, list_id: int, error: Exception) -> None:
+        """Remember a failed refresh of a list and retry it on its own."""
+
+        if list_id not in self.stale_since:
+            _LOGGER.warning(
+                "Unable to refresh KitchenOwl shopping list %s, keeping its last "
+                "data: %s",
+                list_id,
+                error,
+            )
+            self.stale_since[list_id] = dt_util.utcnow()
+        if list_id not in self._list_retries and not self._shutdown_requested:
+            delay = self._list_retry_delays.get(list_id, LIST_RETRY_MIN_DELAY)
+            self._list_retry_delays[list_id] = min(delay * 2, LIST_RETRY_MAX_DELAY)
+            self._list_retries[list_id] = async_call_later(
+                self.hass,
+                delay,
+                HassJob(
+                    partial(self._async_retry_list, list_id), cancel_on_shutdown=True
+                ),
+            )
+        # The list may have become unavailable
+        self.async_update_list_listeners(list_id)
+
+    async def _async_retry_list(self, list_id: int, _now: datetime) -> None:
+        self._list_retries.pop(list_id, None)
+        await self.async_refresh_list(list_id, fresh=False)
+
+    @callback
+    def _async_mark_list_fresh(self, list_id: int) -> None:
+        """Forget the failed refreshes of a list."""
+
+        if (stale_since := self.stale_since.pop(list_id, None)) is None:
+            return
+        _LOGGER.info(
+            "KitchenOwl shopping list %s refreshed again, it was stale since %s",
+            list_id,
+            stale_since,
+        )
+        self._list_retry_delays.pop(list_id, None)
+        if (cancel_retry := self._list_retries.pop(list_id, None)) is not None:
+            cancel_retry()
+
+    @callback
+    def _async_forget_list(self, list_id: int) -> None:
+        """Drop the state kept for a list that was deleted."""
+
+        _LOGGER.debug("KitchenOwl shopping list %s was deleted", list_id)
+        self.stale_since.pop(list_id, None)
+        self._list_retry_delays.pop(list_id, None)
+        self._recent_items_loaded.pop(list_id, None)
+        if (cancel_retry := self._list_retries.pop(list_id, None)) is not None:
+            cancel_retry()
+
+    async def async_shutdown(self) -> None:
+        """Stop the replay of queued changes and the retries of stale lists.
+
+        The changes made locally are sent before it returns, the ones waiting
+        in the batcher right away, so the session must still be open.
+        """
+
+        await super().async_shutdown()
+        if self._replay_task is not None and not self._replay_task.done():
+            # The changes stay queued and are replayed after the next start
+            self._replay_task.cancel()
+            await asyncio.wait([self._replay_task])
+        await self.batcher.async_flush()
+        if self._mutation_tasks:
+            # Changes may only be submitted once an added item has its id
+            await asyncio.wait(self._mutation_tasks)
+        for cancel_retry in self._list_retries.values():
+            cancel_retry()
+        self._list_retries.clear()
+
+    @callback
+    def async_mutate(self, list_id: int, mutations: list[Mutation]) -> None:
+        """Apply changes to a shopping list locally and send them to the server.
+
+        The changes are shown right away and sent in the background. While
+        the server is unreachable, they are queued and replayed in order once
+        it can be reached again.
+        """
+
+        self.async_set_list_data(
+            list_id, apply_mutations(self.data[list_id], mutations)
+        )
+        self.async_note_activity()
+        if self.offline_queue.active:
+            # Keep the order, earlier changes are still waiting
+            self.offline_queue.async_enqueue(mutations)
+            return
+        task = self.hass.async_create_background_task(
+            self._async_send_or_enqueue(mutations),
+            name=f"{DOMAIN}_mutation_{list_id}",
+        )
+        self._mutation_tasks.add(task)
+        task.add_done_callback(self._mutation_tasks.discard)
+
+    async def _async_send_or_enqueue(self, mutations: list[Mutation]) -> None:
+        if unsent := await self._async_send_mutations(mutations):
+            _LOGGER.warning(
+                "KitchenOwl is unreachable, queueing %d changes until it is back",
+                len(unsent),
+            )
+            unsent = [self._with_server_id(mutation) for mutation in unsent]
+            self.offline_queue.async_enqueue(unsent)
+            # A refetch of the list may have dropped the changes meanwhile
+            for list_id in {mutation["list_id"] for mutation in unsent}:
+                if (list_data := self.data.get(list_id)) is not None:
+                    self.async_set_list_data(
+                        list_id,
+                        apply_mutations(
+                            list_data, (m for m in unsent if m["list_id"] == list_id)
+                        ),
+                    )
+
+    async def _async_replay_offline_queue(self) -> None:
+        """Send the queued mutations, the server wins on conflicts."""
+
+        queued = self.offline_queue.mutations
+        server_data: dict[int, ShoppingListData] = dict(self._server_data)
+        mutations: list[Mutation] = []
+        for mutation in queued:
+            mutation = self._with_server_id(mutation)
+            list_data = server_data.get(mutation["list_id"])
+            if (conflict := find_conflict(list_data, mutation)) is not None:
+                _LOGGER.warning(
+                    "Dropping queued %s of KitchenOwl item %s, %s",
+                    mutation["action"],
+                    mutation.get("name", mutation["item_id"]),
+                    conflict,
+                )
+                continue
+            if TYPE_CHECKING:
+                assert list_data is not None
+            # Later mutations are checked against the state after this one
+            server_data[mutation["list_id"]] = apply_mutation(list_data, mutation)
+            mutations.append(mutation)
+
+        _LOGGER.debug("Replaying %d queued KitchenOwl changes", len(mutations))
+        unsent = await self._async_send_mutations(mutations)
+        self.offline_queue.async_finish_replay(
+            len(queued), [self._with_server_id(mutation) for mutation in unsent]
+        )
+        if not unsent:
+            # Show the state of the server with the queued changes settled
+            await self.async_refresh_after_changes()
+
+    async def _async_send_mutations(self, mutations: list[Mutation]) -> list[Mutation]:
+        """Send mutations through the batcher.
+
+        Return the mutations that were not sent because the server is
+        unreachable. Other failures are logged and dropped, the batcher
+        refetches the affected lists to undo them locally.
+        """
+
+        results = await asyncio.gather(
+            *(self._async_send_mutation(mutation) for mutation in mutations),
+            return_exceptions=True,
+        )
+        unsent: list[Mutation] = []
+        for mutation, result in zip(mutations, results, strict=True):
+            if not isinstance(result, BaseException):
+                continue
+            if is_unreachable(result):
+                unsent.append(mutation)
+            elif isinstance(result, KitchenOwlException):
+                _LOGGER.warning(
+                    "Unable to update KitchenOwl shopping list %s: %s",
+                    mutation["list_id"],
+                    result,
+                )
+                if isinstance(result, KitchenOwlAuthException) and self.config_entry:
+                    self.config_entry.async_start_reauth(self.hass)
             else:
-                list_data[lst["id"]] = ShoppingListData(
-                    shopping_list=lst, items=items, recent_items=recent_items
+                _LOGGER.error(
+                    "Unexpected error updating KitchenOwl shopping list %s",
+                    mutation["list_id"],
+                    exc_info=result,
                 )
-        return list_data
+        return unsent
+
+    async def _async_send_mutation(self, mutation: Mutation) -> Any:
+        """Send a single mutation once the item it changes exists on the server."""
+
+        list_id = mutation["list_id"]
+        item_id = mutation["item_id"]
+        if mutation["action"] != ACTION_ADD:
+            if item_id < 0:
+                mutation = {**mutation, "item_id": await self._async_server_id(item_id)}
+            return await self.batcher.async_submit(
+                list_id, *batch_target(mutation), self._mutation_request(mutation)
+            )
+
+        future = self.batcher.async_submit(
+            list_id, *batch_target(mutation), self._mutation_request(mutation)
+        )
+        if item_id < 0:
+            self._pending_adds[item_id] = future
+        try:
+            added: KitchenOwlShoppingListItem = await future
+        finally:
+            self._pending_adds.pop(item_id, None)
+        if item_id < 0:
+            self._server_ids[item_id] = added["id"]
+        if (list_data := self.data.get(list_id)) is not None:
+            self.async_set_list_data(
+                list_id,
+                with_item(
+                    without_items(list_data, {item_id}),
+                    ShoppingListItem.from_kitchenowl(added),
+                    False,
+                ),
+            )
+        return added
+
+    async def _async_server_id(self, local_id: int) -> int:
+        """Return the server id of an item that was created locally."""
+
+        if (server_id := self._server_ids.get(local_id)) is not None:
+            return server_id
+        if (pending := self._pending_adds.get(local_id)) is not None:
+            added: KitchenOwlShoppingListItem = await asyncio.shield(pending)
+            return added["id"]
+        raise KitchenOwlException(f"Item {local_id} was not created on the server")
+
+    def _with_server_id(self, mutation: Mutation) -> Mutation:
+        """Return the mutation for the server id if a local item was created."""
+
+        if (server_id := self._server_ids.get(mutation["item_id"])) is not None:
+            return {**mutation, "item_id": server_id}
+        return mutation
+
+    def _mutation_request(self, mutation: Mutation) -> Callable[[], Awaitable[Any]]:
+        """Return the request that applies the mutation on the server."""
+
+        kitchenowl = self.kitchenowl
+        list_id = mutation["list_id"]
+        item_id = mutation["item_id"]
+        action = mutation["action"]
+        if action == ACTION_ADD:
+            return partial(
+                kitchenowl.add_shoppinglist_item,
+                list_id=list_id,
+                item_name=mutation["name"],
+            )
+        if action == ACTION_RENAME:
+            return partial(
+                kitchenowl.update_item,
+                item_id=item_id,
+                item=KitchenOwlItem(id=item_id, name=mutation["name"]),
+            )
+        if action == ACTION_MOVE:
+            return partial(
+                kitchenowl.update_item,
+                item_id=item_id,
+                item=KitchenOwlItem(
+                    id=item_id, name=mutation["name"], ordering=mutation["ordering"]
+                ),
+            )
+        if action == ACTION_DESCRIPTION:
+            return partial(
+                kitchenowl.update_shoppinglist_item_description,
+                list_id=list_id,
+                item_id=item_id,
+                item_description=mutation["description"],
+            )
+        if action == ACTION_COMPLETE:
+            return partial(
+                kitchenowl.remove_shoppinglist_item, list_id=list_id, item_id=item_id
+            )
+        if action == ACTION_UNCOMPLETE:
+            # KitchenOwl puts an item back on the list by adding it by name
+            return partial(
+                kitchenowl.add_shoppinglist_item,
+                list_id=list_id,
+                item_name=mutation["name"],
+                item_description=mutation["description"],
+            )
+        return partial(kitchenowl.delete_item, item_id=item_id)
@@ -0,0 +1,63 @@
+"""Diagnostics support for KitchenOwl."""
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_ACCESS_TOKEN
+from homeassistant.core import HomeAssistant
+
+from . import KitchenOwlConfigEntry
+
+TO_REDACT = {CONF_ACCESS_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: KitchenOwlConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    The request and connection pool statistics are those of the connection,
+    which is shared by the households of the same user on a server.
+    """
+
+    coordinator = entry.runtime_data
+    kitchenowl = coordinator.kitchenowl
+    refresh = asdict(coordinator.refresh_statistics)
+    for key in ("last_success", "last_failure"):
+        if refresh[key] is not None:
+            refresh[key] = refresh[key].isoformat()
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "push_connected": coordinator.push_connected,
+            "bulk_refresh": coordinator.bulk_refresh,
+            "refresh": refresh,
+            "coalesced_refreshes": coordinator.coalesced_refreshes,
+            "state_writes": asdict(coordinator.state_writes),
+            "lists": {
+                list_id: {
+                    "items": len(list_data["items"]),
+                    "recent_items": len(list_data["recent_items"]),
+                }
+                for list_id, list_data in (coordinator.data or {}).items()
+            },
+            "stale_lists": {
+                list_id: stale_since.isoformat()
+                for list_id, stale_since in coordinator.stale_since.items()
+            },
+            "queued_changes": len(coordinator.offline_queue.mutations),
+        },
+        "connection": {
+            "circuit": kitchenowl.breaker.state,
+            "requests": kitchenowl.statistics.as_dict(),
+            "pool": asdict(coordinator.session_statistics)
+            if coordinator.session_statistics
+            else None,
+        },
+    }
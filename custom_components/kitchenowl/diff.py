@@ -0,0 +1,105 @@
+"""Item level differences between two states of a shopping list."""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .coordinator import ShoppingListData
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_COMPLETED = "completed"
+CHANGE_UNCOMPLETED = "uncompleted"
+CHANGE_RENAMED = "renamed"
+CHANGE_DESCRIPTION = "description_changed"
+CHANGE_MOVED = "moved"
+
+# Changes after which every item keeps its position in the todo list
+IN_PLACE_CHANGES = frozenset({CHANGE_RENAMED, CHANGE_DESCRIPTION})
+
+
+@dataclass(frozen=True, slots=True)
+class ItemChange:
+    """A change of a single item of a shopping list."""
+
+    list_id: int
+    item_id: int
+    change: str
+    name: str
+    completed: bool
+    previous_name: str | None = None
+
+    def as_event_data(self) -> dict[str, Any]:
+        """Return the change as the data of an event."""
+
+        data: dict[str, Any] = {
+            "list_id": self.list_id,
+            "item_id": self.item_id,
+            "change": self.change,
+            "name": self.name,
+            "completed": self.completed,
+        }
+        if self.previous_name is not None:
+            data["previous_name"] = self.previous_name
+        return data
+
+
+def diff_shopping_list(
+    list_id: int, old: "ShoppingListData", new: "ShoppingListData"
+) -> list[ItemChange]:
+    """Return the changes of the items from the old to the new list data.
+
+    An item that changed in several ways has a change for each of them.
+    Items that only exist locally until the server created them have a
+    negative id.
+    """
+
+    if old is new:
+        return []
+    old_index = old["item_index"]
+    new_index = new["item_index"]
+    changes: list[ItemChange] = []
+    for item_id, (item, completed) in new_index.items():
+        if (previous := old_index.get(item_id)) is None:
+            changes.append(
+                ItemChange(list_id, item_id, CHANGE_ADDED, item.name, completed)
+            )
+            continue
+        old_item, old_completed = previous
+        if old_item is item and old_completed == completed:
+            continue
+        if completed != old_completed:
+            changes.append(
+                ItemChange(
+                    list_id,
+                    item_id,
+                    CHANGE_COMPLETED if completed else CHANGE_UNCOMPLETED,
+                    item.name,
+                    completed,
+                )
+            )
+        if item.name != old_item.name:
+            changes.append(
+                ItemChange(
+                    list_id,
+                    item_id,
+                    CHANGE_RENAMED,
+                    item.name,
+                    completed,
+                    previous_name=old_item.name,
+                )
+            )
+        if item.description != old_item.description:
+            changes.append(
+                ItemChange(list_id, item_id, CHANGE_DESCRIPTION, item.name, completed)
+            )
+        if item.ordering != old_item.ordering and completed == old_completed:
+            changes.append(
+                ItemChange(list_id, item_id, CHANGE_MOVED, item.name, completed)
+            )
+    changes.extend(
+        ItemChange(list_id, item_id, CHANGE_REMOVED, item.name, completed)
+        for item_id, (item, completed) in old_index.items()
+        if item_id not in new_index
+    )
+    return changes
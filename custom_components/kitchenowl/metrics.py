@@ -0,0 +1,103 @@
+"""Statistics of the requests sent to KitchenOwl."""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+# Upper bounds in seconds of the buckets of the latency histograms, slower
+# requests are counted in a last, unbounded bucket
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _empty_histogram() -> list[int]:
+    return [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+@dataclass(slots=True)
+class EndpointStatistics:
+    """Count the requests of an endpoint and their latency."""
+
+    requests: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    # Number of entries in the list responses, e.g. the items of a list
+    received_entries: int = 0
+    max_received_entries: int = 0
+    histogram: list[int] = field(default_factory=_empty_histogram)
+
+    def record(self, duration: float, failed: bool, entries: int | None) -> None:
+        """Count a request that took ``duration`` seconds."""
+
+        self.requests += 1
+        if failed:
+            self.failures += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        if entries is not None:
+            self.received_entries += entries
+            self.max_received_entries = max(self.max_received_entries, entries)
+        for bucket, upper_bound in enumerate(LATENCY_BUCKETS):
+            if duration <= upper_bound:
+                self.histogram[bucket] += 1
+                return
+        self.histogram[-1] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for the diagnostics."""
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "mean_latency_ms": round(self.total_time / self.requests * 1000, 1)
+            if self.requests
+            else None,
+            "max_latency_ms": round(self.max_time * 1000, 1),
+            "received_entries": self.received_entries,
+            "max_received_entries": self.max_received_entries,
+            "latency_histogram": {
+                **{
+                    f"<={upper_bound}s": count
+                    for upper_bound, count in zip(
+                        LATENCY_BUCKETS, self.histogram, strict=False
+                    )
+                },
+                f">{LATENCY_BUCKETS[-1]}s": self.histogram[-1],
+            },
+        }
+
+
+class RequestStatistics:
+    """The statistics of the requests sent to a server, by endpoint."""
+
+    def __init__(self) -> None:
+        """Initialise empty statistics."""
+        self.endpoints: dict[str, EndpointStatistics] = {}
+
+    def record(
+        self, endpoint: str, duration: float, failed: bool, entries: int | None = None
+    ) -> None:
+        """Count a request to an endpoint."""
+
+        if (statistics := self.endpoints.get(endpoint)) is None:
+            statistics = self.endpoints[endpoint] = EndpointStatistics()
+        statistics.record(duration, failed, entries)
+
+    @property
+    def requests(self) -> int:
+        """Return the number of requests sent."""
+        return sum(s.requests for s in self.endpoints.values())
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Return the mean latency of all requests in seconds."""
+
+        if not (requests := self.requests):
+            return None
+        return sum(s.total_time for s in self.endpoints.values()) / requests
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics of all endpoints for the diagnostics."""
+        return {
+            endpoint: statistics.as_dict()
+            for endpoint, statistics in sorted(self.endpoints.items())
+        }
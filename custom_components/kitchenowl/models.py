@@ -0,0 +1,42 @@
+"""Compact records of the KitchenOwl data the integration keeps in memory."""
+
+from dataclasses import dataclass
+from typing import Self
+
+from kitchenowl_python.types import KitchenOwlShoppingListItem
+
+
+@dataclass(frozen=True, slots=True)
+class ShoppingListItem:
+    """An item of a shopping list with the fields the integration uses.
+
+    KitchenOwl sends a lot more with every item, e.g. its category, icon and
+    timestamps. Households with long lists and recent histories keep tens of
+    thousands of items, so responses are parsed once into these records and
+    the rest is dropped.
+    """
+
+    id: int
+    name: str
+    description: str = ""
+    ordering: int | None = None
+
+    @classmethod
+    def from_kitchenowl(cls, item: KitchenOwlShoppingListItem) -> Self:
+        """Parse an item returned by KitchenOwl."""
+        return cls(
+            item["id"],
+            item["name"],
+            item.get("description") or "",
+            item.get("ordering"),
+        )
+
+    def as_dict(self) -> KitchenOwlShoppingListItem:
+        """Return the item in the format of KitchenOwl, e.g. to store it."""
+
+        item = KitchenOwlShoppingListItem(
+            id=self.id, name=self.name, description=self.description
+        )
+        if self.ordering is not None:
+            item["ordering"] = self.ordering
+        return item
@@ -0,0 +1,47 @@
+"""Changes to shopping lists, as applied locally and sent to KitchenOwl.
+
+Mutations are plain data, so they can be shown optimistically, stored while
+the server is unreachable and replayed later.
+"""
+
+from typing import NotRequired, TypedDict
+
+ACTION_ADD = "add"
+ACTION_RENAME = "rename"
+ACTION_DESCRIPTION = "description"
+ACTION_COMPLETE = "complete"
+ACTION_UNCOMPLETE = "uncomplete"
+ACTION_DELETE = "delete"
+ACTION_MOVE = "move"
+
+
+class MutationBase(TypedDict):
+    """The state of an item when it was changed locally."""
+
+    name: str
+    description: str
+    completed: bool
+
+
+class Mutation(TypedDict):
+    """A single change to a shopping list."""
+
+    action: str
+    list_id: int
+    # Negative for items that are only known locally
+    item_id: int
+    name: NotRequired[str]
+    description: NotRequired[str]
+    ordering: NotRequired[int]
+    base: NotRequired[MutationBase]
+
+
+def batch_target(mutation: Mutation) -> tuple[int | str, str]:
+    """Return the target and kind under which the batcher coalesces a mutation."""
+
+    action = mutation["action"]
+    if action == ACTION_ADD:
+        return mutation["name"].casefold(), action
+    if action in (ACTION_COMPLETE, ACTION_UNCOMPLETE):
+        return mutation["item_id"], "status"
+    return mutation["item_id"], action
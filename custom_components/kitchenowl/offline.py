@@ -0,0 +1,68 @@
+"""Persistent queue of shopping list changes made while KitchenOwl is unreachable."""
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, OFFLINE_QUEUE_SAVE_DELAY, STORAGE_VERSION
+from .mutations import Mutation
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def offline_queue_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store of the offline queue of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.queue")
+
+
+class OfflineMutationQueue:
+    """Write-ahead queue of mutations that still have to be sent.
+
+    While the queue holds mutations, new mutations are added behind them, so
+    the server receives all changes in the order they were made.
+    """
+
+    def __init__(self, store: Store[dict[str, list[Mutation]]] | None) -> None:
+        """Initialise the queue, it is only kept in memory without a store."""
+
+        self._store = store
+        self._mutations: list[Mutation] = []
+
+    @property
+    def active(self) -> bool:
+        """Return True if there are mutations waiting to be sent."""
+        return bool(self._mutations)
+
+    @property
+    def mutations(self) -> list[Mutation]:
+        """Return the queued mutations, oldest first."""
+        return list(self._mutations)
+
+    async def async_load(self) -> None:
+        """Load the mutations that were not sent before a restart."""
+
+        if self._store is not None and (stored := await self._store.async_load()):
+            self._mutations = stored["mutations"]
+            _LOGGER.info("Loaded %d queued KitchenOwl changes", len(self._mutations))
+
+    @callback
+    def async_enqueue(self, mutations: list[Mutation]) -> None:
+        """Add mutations to the end of the queue."""
+
+        self._mutations.extend(mutations)
+        self._async_save()
+
+    @callback
+    def async_finish_replay(self, count: int, unsent: list[Mutation]) -> None:
+        """Replace the first ``count`` mutations with the ones that were not sent."""
+
+        self._mutations[:count] = unsent
+        self._async_save()
+
+    @callback
+    def _async_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(
+                lambda: {"mutations": self._mutations}, OFFLINE_QUEUE_SAVE_DELAY
+            )
@@ -0,0 +1,114 @@
+"""Order of the open items of a shopping list and moves within it."""
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator
+
+from .models import ShoppingListItem
+
+
+def sort_key(item: ShoppingListItem) -> tuple[int, int]:
+    """Return the key the items of a list are shown in.
+
+    Items are ordered by their ordering, items without one by their id.
+    Items with the same ordering are ordered by id, so every key is unique.
+    """
+    return (item.ordering if item.ordering is not None else item.id, item.id)
+
+
+class ItemOrder:
+    """The open items of a shopping list in the order they are shown.
+
+    The sort keys are kept in a sorted list that is updated by bisection
+    when an item is added, removed or moved, instead of sorting the whole
+    list again.
+    """
+
+    def __init__(self, items: Iterable[ShoppingListItem]) -> None:
+        """Initialise the order of the items."""
+
+        self._keys = sorted(sort_key(item) for item in items)
+        self._key_by_id = {key[1]: key for key in self._keys}
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the item ids in order."""
+        return (key[1] for key in self._keys)
+
+    def __contains__(self, item_id: object) -> bool:
+        """Return True if the item is in the order."""
+        return item_id in self._key_by_id
+
+    def index(self, item_id: int) -> int:
+        """Return the position of an item."""
+        return bisect_left(self._keys, self._key_by_id[item_id])
+
+    def add(self, item: ShoppingListItem) -> int:
+        """Add an item and return its position."""
+
+        key = self._key_by_id[item.id] = sort_key(item)
+        insort(self._keys, key)
+        return self.index(item.id)
+
+    def remove(self, item_id: int) -> int:
+        """Remove an item and return the position it had."""
+
+        position = self.index(item_id)
+        del self._keys[position]
+        del self._key_by_id[item_id]
+        return position
+
+    def plan_move(self, item_id: int, previous_id: int | None) -> dict[int, int]:
+        """Return the new orderings that move an item behind another one.
+
+        If ``previous_id`` is None the item is moved to the front. Only the
+        moved item gets a new ordering if there is room for it between its
+        new neighbours. Otherwise the neighbours on the side with the fewest
+        of them in the way are shifted to make room. Orderings are never
+        negative.
+        """
+
+        keys = self._keys.copy()
+        del keys[self.index(item_id)]
+        position = (
+            0
+            if previous_id is None
+            else bisect_left(keys, self._key_by_id[previous_id]) + 1
+        )
+        before = keys[position - 1] if position else None
+        after = keys[position] if position < len(keys) else None
+
+        # The orderings that sort the item between its neighbours
+        low = 0 if before is None else before[0] + (before[1] > item_id)
+        if after is None:
+            return {item_id: low}
+        high = after[0] - (after[1] < item_id)
+        if low <= high:
+            return {item_id: (low + high) // 2}
+
+        # Shift the following items up
+        shift_up = {item_id: low}
+        previous = (low, item_id)
+        for key in keys[position:]:
+            if key > previous:
+                break
+            previous = (previous[0] + (key[1] < previous[1]), key[1])
+            shift_up[key[1]] = previous[0]
+
+        # Shift the preceding items down, if they stay above zero
+        shift_down: dict[int, int] | None = {item_id: high} if high >= 0 else None
+        following = (high, item_id)
+        for key in reversed(keys[:position]):
+            if shift_down is None or key < following:
+                break
+            following = (following[0] - (key[1] > following[1]), key[1])
+            if following[0] < 0:
+                shift_down = None
+                break
+            shift_down[key[1]] = following[0]
+
+        if shift_down is not None and len(shift_down) < len(shift_up):
+            return shift_down
+        return shift_up
@@ -0,0 +1,182 @@
+"""Realtime push updates from a KitchenOwl instance.
+
+KitchenOwl publishes changes to shopping lists over Socket.IO. Only a small
+part of the protocol is needed to receive these events, so the client below
+talks Engine.IO v4 / Socket.IO v5 directly over an aiohttp websocket instead
+of pulling in a full Socket.IO client.
+"""
+
+import asyncio
+from collections.abc import Callable
+import json
+import logging
+from typing import Any
+
+import aiohttp
+
+from .const import PUSH_RECONNECT_MAX_DELAY, PUSH_RECONNECT_MIN_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+SOCKETIO_PATH = "socket.io/"
+
+# Engine.IO packet types
+_EIO_OPEN = "0"
+_EIO_CLOSE = "1"
+_EIO_PING = "2"
+_EIO_PONG = "3"
+_EIO_MESSAGE = "4"
+
+# Socket.IO packet types, sent inside an Engine.IO message
+_SIO_CONNECT = "0"
+_SIO_DISCONNECT = "1"
+_SIO_EVENT = "2"
+_SIO_CONNECT_ERROR = "4"
+
+EVENT_SHOPPINGLIST_ITEM_ADD = "shoppinglist_item:add"
+EVENT_SHOPPINGLIST_ITEM_REMOVE = "shoppinglist_item:remove"
+
+
+class KitchenOwlPushError(Exception):
+    """Raised when the realtime connection cannot be established."""
+
+
+class KitchenOwlPushClient:
+    """Receive realtime shopping list events from KitchenOwl.
+
+    ``async_run`` keeps reconnecting with an increasing delay until it is
+    cancelled, whatever error ended the connection. Every received event is
+    passed to ``on_event`` and every change of the connection state to
+    ``on_connection_change``.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        token: str,
+        on_event: Callable[[str, dict[str, Any]], None],
+        on_connection_change: Callable[[bool], None],
+    ) -> None:
+        """Initialise the push client."""
+
+        self._session = session
+        self._url = f"{host.rstrip('/')}/{SOCKETIO_PATH}"
+        self._token = token
+        self._on_event = on_event
+        self._on_connection_change = on_connection_change
+        self._connected = False
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the realtime connection is established."""
+        return self._connected
+
+    async def async_run(self) -> None:
+        """Keep the realtime connection open until cancelled."""
+
+        delay = PUSH_RECONNECT_MIN_DELAY
+        try:
+            while True:
+                try:
+                    await self._async_listen()
+                except (aiohttp.ClientError, TimeoutError, KitchenOwlPushError) as e:
+                    _LOGGER.debug("KitchenOwl realtime connection lost: %s", e)
+                except Exception:
+                    # E.g. a malformed packet, keep reconnecting anyway
+                    _LOGGER.exception(
+                        "Unexpected error in KitchenOwl realtime connection"
+                    )
+                else:
+                    # A clean close by the server, e.g. during a restart
+                    delay = PUSH_RECONNECT_MIN_DELAY
+                self._set_connected(False)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PUSH_RECONNECT_MAX_DELAY)
+        finally:
+            self._set_connected(False)
+
+    async def _async_listen(self) -> None:
+        """Open one websocket connection and dispatch its events."""
+
+        async with self._session.ws_connect(
+            self._url,
+            params={"EIO": "4", "transport": "websocket"},
+            headers={"Authorization": f"Bearer {self._token}"},
+        ) as ws:
+            open_packet = await ws.receive_str(timeout=10)
+            if not open_packet.startswith(_EIO_OPEN):
+                raise KitchenOwlPushError(f"Unexpected handshake: {open_packet}")
+            handshake = json.loads(open_packet[1:])
+            # The server pings every pingInterval and expects traffic within
+            # pingInterval + pingTimeout, otherwise the connection is dead.
+            receive_timeout = (
+                handshake.get("pingInterval", 25000)
+                + handshake.get("pingTimeout", 20000)
+            ) / 1000
+
+            await ws.send_str(
+                _EIO_MESSAGE + _SIO_CONNECT + json.dumps({"token": self._token})
+            )
+
+            while True:
+                msg = await ws.receive(timeout=receive_timeout)
+                if msg.type in (
+                    aiohttp.WSMsgType.CLOSE,
+                    aiohttp.WSMsgType.CLOSING,
+                    aiohttp.WSMsgType.CLOSED,
+                ):
+                    return
+                if msg.type == aiohttp.WSMsgType.ERROR:
+                    raise KitchenOwlPushError(str(ws.exception()))
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                if not await self._async_handle_packet(ws, msg.data):
+                    return
+
+    async def _async_handle_packet(
+        self, ws: aiohttp.ClientWebSocketResponse, packet: str
+    ) -> bool:
+        """Handle one Engine.IO packet, return False if the session ended."""
+
+        if packet == _EIO_PING:
+            await ws.send_str(_EIO_PONG)
+            return True
+        if packet.startswith(_EIO_CLOSE):
+            return False
+        if not packet.startswith(_EIO_MESSAGE) or len(packet) < 2:
+            return True
+
+        sio_type, sio_data = packet[1], packet[2:]
+        if sio_type == _SIO_CONNECT:
+            _LOGGER.debug("KitchenOwl realtime connection established")
+            self._set_connected(True)
+        elif sio_type == _SIO_CONNECT_ERROR:
+            raise KitchenOwlPushError(f"Connection refused: {sio_data}")
+        elif sio_type == _SIO_DISCONNECT:
+            return False
+        elif sio_type == _SIO_EVENT:
+            self._dispatch_event(sio_data)
+        return True
+
+    def _dispatch_event(self, sio_data: str) -> None:
+        """Decode a Socket.IO event and pass it on."""
+
+        # Events may carry a namespace ("/ns,") or an ack id before the payload
+        payload_start = sio_data.find("[")
+        if payload_start < 0:
+            return
+        try:
+            event = json.loads(sio_data[payload_start:])
+        except ValueError:
+            _LOGGER.debug("Ignoring malformed KitchenOwl event: %s", sio_data)
+            return
+        if not event or not isinstance(event[0], str):
+            return
+        data = event[1] if len(event) > 1 and isinstance(event[1], dict) else {}
+        self._on_event(event[0], data)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self._connected:
+            self._connected = connected
+            self._on_connection_change(connected)
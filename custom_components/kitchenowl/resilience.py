@@ -0,0 +1,291 @@
+"""Retries, timeouts and a circuit breaker around the KitchenOwl client."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+from kitchenowl_python.exceptions import KitchenOwlRequestException
+from kitchenowl_python.kitchenowl import KitchenOwl
+from kitchenowl_python.types import (
+    KitchenOwlHouseholdsResponse,
+    KitchenOwlItem,
+    KitchenOwlShoppingListItem,
+    KitchenOwlShoppingListItemsResponse,
+    KitchenOwlShoppingListsResponse,
+    KitchenOwlUser,
+)
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_RESET_TIMEOUT,
+    CIRCUIT_RESET_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    REQUEST_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+from .metrics import RequestStatistics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Responses of a reverse proxy while KitchenOwl itself is down
+_UNAVAILABLE_STATUSES = (
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+)
+
+# Timeouts in seconds of the endpoints that are expected to answer quickly,
+# the others use DEFAULT_REQUEST_TIMEOUT
+ENDPOINT_TIMEOUTS: dict[str, float] = {
+    "test_connection": 10,
+    "get_user_info": 10,
+    "get_households": 10,
+    "remove_shoppinglist_item": 15,
+    "update_shoppinglist_item_description": 15,
+    "update_item": 15,
+    "delete_item": 15,
+}
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class KitchenOwlCircuitOpenError(KitchenOwlRequestException):
+    """The server failed repeatedly, requests are not sent for now."""
+
+
+def is_unreachable(error: BaseException) -> bool:
+    """Return True if a request failed because the server is unreachable."""
+
+    if isinstance(error, TimeoutError | KitchenOwlCircuitOpenError):
+        return True
+    if not isinstance(error, KitchenOwlRequestException):
+        return False
+    cause = error.__cause__
+    if isinstance(cause, aiohttp.ClientResponseError):
+        return cause.status in _UNAVAILABLE_STATUSES
+    return isinstance(cause, aiohttp.ClientConnectionError | TimeoutError)
+
+
+class CircuitBreaker:
+    """Stop sending requests to a server that keeps failing.
+
+    The circuit opens after ``CIRCUIT_FAILURE_THRESHOLD`` requests in a row
+    failed because the server was unreachable. While it is open, requests
+    fail right away. After the reset timeout a single probe request is let
+    through: if it succeeds the circuit closes, otherwise it opens again and
+    the reset timeout doubles up to ``CIRCUIT_MAX_RESET_TIMEOUT``.
+    """
+
+    def __init__(self) -> None:
+        """Initialise a closed circuit."""
+
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+
+    def before_request(self) -> None:
+        """Raise if the request must not be sent now."""
+
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if (
+            self.state == CIRCUIT_OPEN
+            and time.monotonic() - self._opened_at >= self._reset_timeout
+        ):
+            # Let this request through as the probe
+            self.state = CIRCUIT_HALF_OPEN
+            return
+        raise KitchenOwlCircuitOpenError(
+            "KitchenOwl is unreachable, requests are paused"
+        )
+
+    def record_success(self) -> None:
+        """Close the circuit after the server answered."""
+
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("KitchenOwl is reachable again, resuming requests")
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._reset_timeout = CIRCUIT_RESET_TIMEOUT
+
+    def record_abandoned(self) -> None:
+        """Open the circuit again after a probe that did not finish.
+
+        The reset timeout is kept, so the next request is sent as the probe.
+        """
+
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.state = CIRCUIT_OPEN
+
+    def record_failure(self) -> None:
+        """Count a request that failed because the server is unreachable."""
+
+        self._failures += 1
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._reset_timeout = min(
+                self._reset_timeout * 2, CIRCUIT_MAX_RESET_TIMEOUT
+            )
+        elif self.state == CIRCUIT_OPEN or self._failures < CIRCUIT_FAILURE_THRESHOLD:
+            return
+        _LOGGER.warning(
+            "KitchenOwl failed %d times in a row, pausing requests for %d seconds",
+            self._failures,
+            self._reset_timeout,
+        )
+        self.state = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+
+
+class ResilientKitchenOwl:
+    """KitchenOwl client that retries, times out and short-circuits requests.
+
+    Requests that fail because the server is unreachable are retried up to
+    ``REQUEST_RETRIES`` times with exponential backoff and full jitter, so
+    the clients of a restarting server do not retry in lockstep. Other
+    failures, e.g. authentication errors, are raised right away.
+
+    Every request sent, including retries, is counted in ``statistics``.
+    """
+
+    def __init__(self, kitchenowl: KitchenOwl) -> None:
+        """Wrap a KitchenOwl client."""
+
+        self.client = kitchenowl
+        self.breaker = CircuitBreaker()
+        self.statistics = RequestStatistics()
+
+    async def _async_request[_T](
+        self, endpoint: str, request: Callable[..., Awaitable[_T]], *args: Any
+    ) -> _T:
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_REQUEST_TIMEOUT)
+        for attempt in range(REQUEST_RETRIES + 1):
+            self.breaker.before_request()
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(timeout):
+                    result = await request(*args)
+            except Exception as e:
+                self.statistics.record(endpoint, time.monotonic() - start, True)
+                if not is_unreachable(e):
+                    # The server answered
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == REQUEST_RETRIES or self.breaker.state != CIRCUIT_CLOSED:
+                    raise
+                delay = random.uniform(
+                    0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+                )
+                _LOGGER.debug(
+                    "KitchenOwl request %s failed, retrying in %.1f seconds: %s",
+                    endpoint,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
+            except BaseException:
+                # E.g. cancelled, the server neither answered nor failed
+                self.breaker.record_abandoned()
+                raise
+            else:
+                self.statistics.record(
+                    endpoint,
+                    time.monotonic() - start,
+                    False,
+                    len(result) if isinstance(result, list) else None,
+                )
+                self.breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+
+    async def test_connection(self) -> bool:
+        """Test the connection to KitchenOwl."""
+        return await self._async_request("test_connection", self.client.test_connection)
+
+    async def get_user_info(self) -> KitchenOwlUser:
+        """Get the user the token belongs to."""
+        return await self._async_request("get_user_info", self.client.get_user_info)
+
+    async def get_households(self) -> KitchenOwlHouseholdsResponse:
+        """Get the households of the user."""
+        return await self._async_request("get_households", self.client.get_households)
+
+    async def get_shoppinglists(
+        self, household_id: int | str
+    ) -> KitchenOwlShoppingListsResponse:
+        """Get the shopping lists of a household."""
+        return await self._async_request(
+            "get_shoppinglists", self.client.get_shoppinglists, household_id
+        )
+
+    async def get_shoppinglist_items(
+        self, list_id: int
+    ) -> KitchenOwlShoppingListItemsResponse:
+        """Get the items on a shopping list."""
+        return await self._async_request(
+            "get_shoppinglist_items", self.client.get_shoppinglist_items, list_id
+        )
+
+    async def get_shoppinglist_recent_items(
+        self, list_id: int
+    ) -> KitchenOwlShoppingListItemsResponse:
+        """Get the recently completed items of a shopping list."""
+        return await self._async_request(
+            "get_shoppinglist_recent_items",
+            self.client.get_shoppinglist_recent_items,
+            list_id,
+        )
+
+    async def add_shoppinglist_item(
+        self, list_id: int, item_name: str, item_description: str = ""
+    ) -> KitchenOwlShoppingListItem:
+        """Add an item to a shopping list by name."""
+        return await self._async_request(
+            "add_shoppinglist_item",
+            self.client.add_shoppinglist_item,
+            list_id,
+            item_name,
+            item_description,
+        )
+
+    async def update_shoppinglist_item_description(
+        self, list_id: int, item_id: int, item_description: str
+    ) -> KitchenOwlShoppingListItem:
+        """Update the description of an item on a shopping list."""
+        return await self._async_request(
+            "update_shoppinglist_item_description",
+            self.client.update_shoppinglist_item_description,
+            list_id,
+            item_id,
+            item_description,
+        )
+
+    async def remove_shoppinglist_item(self, list_id: int, item_id: int) -> bool:
+        """Remove an item from a shopping list."""
+        return await self._async_request(
+            "remove_shoppinglist_item",
+            self.client.remove_shoppinglist_item,
+            list_id,
+            item_id,
+        )
+
+    async def update_item(self, item_id: int, item: KitchenOwlItem) -> KitchenOwlItem:
+        """Update an item."""
+        return await self._async_request(
+            "update_item", self.client.update_item, item_id, item
+        )
+
+    async def delete_item(self, item_id: int) -> KitchenOwlItem:
+        """Delete an item."""
+        return await self._async_request(
+            "delete_item", self.client.delete_item, item_id
+        )
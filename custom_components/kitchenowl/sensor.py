@@ -0,0 +1,148 @@
+"""Diagnostic sensors of the KitchenOwl integration."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import KitchenOwlConfigEntry
+from .const import DOMAIN
+from .coordinator import KitchenOwlDataUpdateCoordinator
+
+
+def _mean_request_latency(coordinator: KitchenOwlDataUpdateCoordinator) -> float | None:
+    latency = coordinator.kitchenowl.statistics.mean_latency
+    return round(latency * 1000, 1) if latency is not None else None
+
+
+def _refresh_duration(coordinator: KitchenOwlDataUpdateCoordinator) -> float | None:
+    duration = coordinator.refresh_statistics.last_duration
+    return round(duration * 1000, 1) if duration is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class KitchenOwlSensorEntityDescription(SensorEntityDescription):
+    """Describes a KitchenOwl diagnostic sensor."""
+
+    value_fn: Callable[[KitchenOwlDataUpdateCoordinator], StateType | datetime]
+
+
+SENSORS: tuple[KitchenOwlSensorEntityDescription, ...] = (
+    KitchenOwlSensorEntityDescription(
+        key="refresh_duration",
+        translation_key="refresh_duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_refresh_duration,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="last_successful_refresh",
+        translation_key="last_successful_refresh",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.refresh_statistics.last_success,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="last_failed_refresh",
+        translation_key="last_failed_refresh",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.refresh_statistics.last_failure,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="fetched_items",
+        translation_key="fetched_items",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.refresh_statistics.fetched_items,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="requests",
+        translation_key="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.kitchenowl.statistics.requests,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="mean_request_latency",
+        translation_key="mean_request_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_mean_request_latency,
+    ),
+    KitchenOwlSensorEntityDescription(
+        key="skipped_state_writes",
+        translation_key="skipped_state_writes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.state_writes.skipped,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: KitchenOwlConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic sensors, they are disabled by default."""
+
+    coordinator = entry.runtime_data
+    unique_id = entry.unique_id
+
+    if TYPE_CHECKING:
+        assert unique_id
+
+    async_add_entities(
+        KitchenOwlSensorEntity(coordinator, description, unique_id, entry.title)
+        for description in SENSORS
+    )
+
+
+class KitchenOwlSensorEntity(
+    CoordinatorEntity[KitchenOwlDataUpdateCoordinator], SensorEntity
+):
+    """Diagnostic sensor of a KitchenOwl household."""
+
+    entity_description: KitchenOwlSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: KitchenOwlDataUpdateCoordinator,
+        description: KitchenOwlSensorEntityDescription,
+        entry_unique_id: str,
+        title: str,
+    ) -> None:
+        """Initialise the sensor."""
+
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry_unique_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_unique_id)},
+            name=title,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True, the statistics are also known while refreshes fail."""
+        return True
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the value of the statistic."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,133 @@
+"""HTTP session for the requests to a KitchenOwl server."""
+
+from dataclasses import dataclass
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp import hdrs
+from aiohttp.abc import AbstractResolver
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import aiohttp_client
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    DEFAULT_REQUEST_TIMEOUT,
+    SESSION_CONNECT_TIMEOUT,
+    SESSION_DNS_CACHE_TTL,
+    SESSION_KEEPALIVE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionStatistics:
+    """Count the use of the connection pool of a session."""
+
+    limit_per_host: int
+    # Requests sent and not answered yet
+    in_flight: int = 0
+    # Requests waiting for a free connection now and in total
+    queued: int = 0
+    queued_total: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config that counts the requests of a session."""
+
+        def counter(attribute: str, delta: int) -> Any:
+            async def count(
+                _session: aiohttp.ClientSession, _context: SimpleNamespace, _: Any
+            ) -> None:
+                setattr(self, attribute, getattr(self, attribute) + delta)
+
+            return count
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(counter("in_flight", 1))
+        trace_config.on_request_end.append(counter("in_flight", -1))
+        trace_config.on_request_exception.append(counter("in_flight", -1))
+        trace_config.on_connection_queued_start.append(counter("queued", 1))
+        trace_config.on_connection_queued_start.append(counter("queued_total", 1))
+        trace_config.on_connection_queued_end.append(counter("queued", -1))
+        trace_config.on_connection_create_end.append(counter("connections_created", 1))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused", 1))
+        trace_config.on_dns_cache_hit.append(counter("dns_cache_hits", 1))
+        trace_config.on_dns_cache_miss.append(counter("dns_cache_misses", 1))
+        return trace_config
+
+
+@callback
+def _async_make_resolver(hass: HomeAssistant) -> AbstractResolver | None:
+    """Return the resolver of Home Assistant, which also resolves mDNS names.
+
+    Home Assistant has no public API for it, so the private helper its own
+    sessions use is taken if it still exists, as it does in Home Assistant
+    2025.4. Without it aiohttp uses its default resolver and ``.local``
+    hosts may not resolve.
+    """
+
+    if (make_resolver := getattr(aiohttp_client, "_async_make_resolver", None)) is None:
+        _LOGGER.debug("Resolver of Home Assistant not found, using the default")
+        return None
+    return make_resolver(hass)
+
+
+@callback
+def async_create_session(
+    hass: HomeAssistant, verify_ssl: bool, limit_per_host: int
+) -> tuple[aiohttp.ClientSession, SessionStatistics, CALLBACK_TYPE]:
+    """Return a new session for a KitchenOwl server and its statistics.
+
+    The session has a connection pool of its own instead of sharing the one
+    of Home Assistant with every other integration. Connections are kept
+    alive between the polls, the server name is resolved once for several
+    of them and responses are requested compressed. Names are resolved like
+    in the session of Home Assistant, so ``.local`` hosts work. The session
+    has to be closed once it is no longer used, it is closed with Home
+    Assistant otherwise. The returned callback removes the listener that
+    closes it with Home Assistant and has to be called when it is closed.
+    """
+
+    statistics = SessionStatistics(limit_per_host)
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_util.client_context()
+        if verify_ssl
+        else ssl_util.client_context_no_verify(),
+        limit=limit_per_host,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=SESSION_DNS_CACHE_TTL,
+        resolver=_async_make_resolver(hass),
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            hdrs.USER_AGENT: aiohttp_client.SERVER_SOFTWARE,
+            hdrs.ACCEPT_ENCODING: "gzip, deflate",
+        },
+        # The client limits the total time of each request
+        timeout=aiohttp.ClientTimeout(
+            total=None,
+            connect=SESSION_CONNECT_TIMEOUT,
+            sock_read=DEFAULT_REQUEST_TIMEOUT,
+        ),
+        trace_configs=[statistics.trace_config()],
+    )
+
+    @callback
+    def _async_close_session(_: Event) -> None:
+        session.detach()
+
+    remove_close_listener = hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_CLOSE, _async_close_session
+    )
+    return session, statistics, remove_close_listener
@@ -0,0 +1,76 @@
+"""Coalescing of concurrent fetches of the same KitchenOwl data."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+class SingleFlight[_T]:
+    """Share one running fetch per key between concurrent callers.
+
+    A caller that only needs recent data joins a fetch of the key that is
+    already running. A caller that needs data read after it asked, e.g. to
+    show the result of a mutation, cannot use a fetch that started before,
+    so it waits for one trailing fetch instead. All callers arriving while a
+    fetch runs share the same trailing fetch, so a burst of calls sends at
+    most two fetches.
+
+    The fetches run as tasks of their own, a cancelled caller does not
+    cancel the fetch for the others.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise the single flight."""
+
+        self._hass = hass
+        self._running: dict[Hashable, asyncio.Task[_T]] = {}
+        self._trailing: dict[Hashable, asyncio.Task[_T]] = {}
+        # Number of calls that were served by a fetch of another caller
+        self.joined = 0
+
+    async def async_run(
+        self, key: Hashable, fetch: Callable[[], Awaitable[_T]], fresh: bool = True
+    ) -> _T:
+        """Return the result of a fetch of the key, running it if needed.
+
+        If ``fresh`` is True the fetch started after this call.
+        """
+
+        if (task := self._running.get(key)) is None:
+            task = self._async_start(key, fetch)
+        elif not fresh:
+            self.joined += 1
+        elif (trailing := self._trailing.get(key)) is not None:
+            self.joined += 1
+            task = trailing
+        else:
+            task = self._trailing[key] = self._hass.async_create_background_task(
+                self._async_run_after(key, task, fetch), name=f"{DOMAIN}_fetch"
+            )
+        return await asyncio.shield(task)
+
+    def _async_start(
+        self, key: Hashable, fetch: Callable[[], Awaitable[_T]]
+    ) -> asyncio.Task[_T]:
+        task = self._hass.async_create_background_task(fetch(), name=f"{DOMAIN}_fetch")
+        self._running[key] = task
+
+        def _remove(_: asyncio.Task[_T]) -> None:
+            if self._running.get(key) is task:
+                del self._running[key]
+
+        task.add_done_callback(_remove)
+        return task
+
+    async def _async_run_after(
+        self,
+        key: Hashable,
+        running: asyncio.Task[_T],
+        fetch: Callable[[], Awaitable[_T]],
+    ) -> _T:
+        await asyncio.wait([running])
+        del self._trailing[key]
+        return await self._async_start(key, fetch)
@@ -1,34 +1,67 @@
 """Todo shopping list platform for KitchenOwl."""
 
-import asyncio
 import logging
 from typing import TYPE_CHECKING
 
-from kitchenowl_python.types import KitchenOwlItem, KitchenOwlShoppingListItem
+import voluptuous as vol
 
-from config.custom_components.kitchenowl import KitchenOwlConfigEntry
 from homeassistant.components.todo import (
     TodoItem,
     TodoItemStatus,
     TodoListEntity,
     TodoListEntityFeature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import (
+    config_validation as cv,
+    entity_platform,
+    entity_registry as er,
+)
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from . import KitchenOwlConfigEntry
+from .const import (
+    ATTR_COUNT,
+    ATTR_ITEMS,
+    ATTR_LIMIT,
+    ATTR_QUERY,
+    SERVICE_ADD_ITEMS,
+    SERVICE_LOAD_RECENT_ITEMS,
+    SERVICE_SEARCH_ITEMS,
+)
 from .coordinator import KitchenOwlDataUpdateCoordinator, ShoppingListData
+from .diff import CHANGE_MOVED, IN_PLACE_CHANGES
+from .models import ShoppingListItem
+from .mutations import (
+    ACTION_ADD,
+    ACTION_COMPLETE,
+    ACTION_DELETE,
+    ACTION_DESCRIPTION,
+    ACTION_MOVE,
+    ACTION_RENAME,
+    ACTION_UNCOMPLETE,
+    Mutation,
+    MutationBase,
+)
+from .ordering import ItemOrder, sort_key
 
 _LOGGER = logging.getLogger(__name__)
 
 
 def _convert_kitchenowl_item_to_todo(
-    item: KitchenOwlShoppingListItem, completed: bool = True
+    item: ShoppingListItem, completed: bool = True
 ) -> TodoItem:
     return TodoItem(
-        uid=str(item["id"]),  # homeassistant expects str for item uids
-        summary=item["name"],
-        description=item["description"] or "",
+        uid=str(item.id),  # homeassistant expects str for item uids
+        summary=item.name,
+        description=item.description,
         status=TodoItemStatus.COMPLETED if completed else TodoItemStatus.NEEDS_ACTION,
     )
 
@@ -47,9 +80,55 @@ async def async_setup_entry(
     if TYPE_CHECKING:
         assert unique_id
 
-    async_add_entities(
-        KitchenOwlTodoListEntity(coordinator, list_data, unique_id)
-        for list_data in coordinator.data.values()
+    entities: dict[int, KitchenOwlTodoListEntity] = {}
+
+    @callback
+    def _async_update_lists() -> None:
+        """Add entities for new lists and remove those of deleted lists."""
+
+        if coordinator.data is None:
+            return
+        entity_registry = er.async_get(hass)
+        for list_id in entities.keys() - coordinator.data.keys():
+            entity = entities.pop(list_id)
+            if entity.registry_entry is not None:
+                # Removing the registry entry removes the entity as well
+                entity_registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove(force_remove=True))
+        new_entities = {
+            list_id: KitchenOwlTodoListEntity(coordinator, list_data, unique_id)
+            for list_id, list_data in coordinator.data.items()
+            if list_id not in entities
+        }
+        if new_entities:
+            entities.update(new_entities)
+            async_add_entities(new_entities.values())
+
+    _async_update_lists()
+    entry.async_on_unload(coordinator.async_add_listener(_async_update_lists))
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_ADD_ITEMS,
+        {vol.Required(ATTR_ITEMS): vol.All(cv.ensure_list, [cv.string])},
+        "async_add_items",
+    )
+    platform.async_register_entity_service(
+        SERVICE_LOAD_RECENT_ITEMS,
+        {vol.Optional(ATTR_COUNT): vol.All(vol.Coerce(int), vol.Range(min=1))},
+        "async_load_recent_items",
+    )
+    platform.async_register_entity_service(
+        SERVICE_SEARCH_ITEMS,
+        {
+            vol.Required(ATTR_QUERY): cv.string,
+            vol.Optional(ATTR_LIMIT, default=10): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=100)
+            ),
+        },
+        "async_search_items",
+        supports_response=SupportsResponse.ONLY,
     )
 
 
@@ -65,6 +144,7 @@ class KitchenOwlTodoListEntity(
         | TodoListEntityFeature.UPDATE_TODO_ITEM
         | TodoListEntityFeature.DELETE_TODO_ITEM
         | TodoListEntityFeature.SET_DESCRIPTION_ON_ITEM
+        | TodoListEntityFeature.MOVE_TODO_ITEM
     )
 
     def __init__(
@@ -81,26 +161,102 @@ class KitchenOwlTodoListEntity(
             f"{entry_unique_id}_{shopping_list_data["shopping_list"]["id"]}"
         )
         self._attr_name = shopping_list_data["shopping_list"]["name"]
+        self._todo_items: list[TodoItem] = []
+        self._todo_items_source: ShoppingListData | None = None
+        # The open items in the order they are shown
+        self._order = ItemOrder(())
+        # Position of each item in the todo items, built when first needed
+        self._todo_positions: dict[int, int] | None = None
+        self._written_list_data: ShoppingListData | None = None
+        self._written_available: bool | None = None
 
     @property
     def todo_items(self) -> list[TodoItem]:
         """Return the todo items."""
-        return [
+        return self._update_todo_items()
+
+    def _update_todo_items(self) -> list[TodoItem]:
+        """Return the todo items, bringing them up to date with the list.
+
+        The items are only converted and sorted again when the data of this
+        list was replaced by the coordinator. If open items were only moved,
+        renamed or their descriptions changed, only those items are converted
+        again and moved items are put in their new place.
+        """
+
+        shopping_list = self.shopping_list
+        if shopping_list is self._todo_items_source:
+            return self._todo_items
+        if self._todo_items_source is not None and (
+            self._update_todo_items_in_place(shopping_list)
+        ):
+            return self._todo_items
+        item_index = shopping_list["item_index"]
+        self._order = ItemOrder(shopping_list["items"])
+        self._todo_items = [
             *(
-                _convert_kitchenowl_item_to_todo(item, False)
-                for item in sorted(
-                    self.shopping_list["items"],
-                    key=lambda i: i["ordering"] if "ordering" in i else i["id"],
-                )
+                _convert_kitchenowl_item_to_todo(item_index[item_id][0], False)
+                for item_id in self._order
             ),
             *(
                 _convert_kitchenowl_item_to_todo(item, True)
                 for item in sorted(
-                    self.shopping_list["recent_items"],
-                    key=lambda i: i["ordering"] if "ordering" in i else i["id"],
+                    shopping_list["recent_items"],
+                    key=sort_key,
                 )
             ),
         ]
+        self._todo_items_source = shopping_list
+        self._todo_positions = None
+        return self._todo_items
+
+    def _update_todo_items_in_place(self, shopping_list: ShoppingListData) -> bool:
+        """Convert only the changed items and move the moved open items.
+
+        Returns False if the todo items need to be built again.
+        """
+
+        assert self._todo_items_source is not None
+        changes = self.coordinator.async_list_changes(
+            self._shoppinglist_id, self._todo_items_source, shopping_list
+        )
+        if any(
+            change.change not in IN_PLACE_CHANGES
+            and (change.change != CHANGE_MOVED or change.completed)
+            for change in changes
+        ):
+            return False
+        if not changes:
+            self._todo_items_source = shopping_list
+            return True
+
+        item_index = shopping_list["item_index"]
+        # The state machine may still hold the previous list
+        todo_items = self._todo_items.copy()
+        for change in changes:
+            if change.change == CHANGE_MOVED:
+                item = item_index[change.item_id][0]
+                del todo_items[self._order.remove(item.id)]
+                todo_items.insert(
+                    self._order.add(item), _convert_kitchenowl_item_to_todo(item, False)
+                )
+                self._todo_positions = None
+        for change in changes:
+            if change.change not in IN_PLACE_CHANGES:
+                continue
+            if self._todo_positions is None:
+                self._todo_positions = {
+                    int(todo_item.uid): position
+                    for position, todo_item in enumerate(todo_items)
+                    if todo_item.uid is not None
+                }
+            item, completed = item_index[change.item_id]
+            todo_items[self._todo_positions[change.item_id]] = (
+                _convert_kitchenowl_item_to_todo(item, completed)
+            )
+        self._todo_items = todo_items
+        self._todo_items_source = shopping_list
+        return True
 
     @property
     def shopping_list(
@@ -109,6 +265,30 @@ class KitchenOwlTodoListEntity(
         """Return the kitchenowl list."""
         return self.coordinator.data[self._shoppinglist_id]
 
+    @property
+    def _list_deleted(self) -> bool:
+        """Return True if the list was deleted on the server.
+
+        The entity is about to be removed then.
+        """
+        return self._shoppinglist_id not in self.coordinator.data
+
+    @property
+    def available(self) -> bool:
+        """Return True while the list can be changed.
+
+        Availability is tracked per list, a list that failed to refresh on
+        its own stays available with its last data for a while. Changes made
+        while the server is unreachable are queued, so the list also stays
+        available while there are any.
+        """
+        if self._list_deleted:
+            return False
+        return (
+            super().available
+            and self.coordinator.async_list_available(self._shoppinglist_id)
+        ) or self.coordinator.offline_queue.active
+
     async def async_create_todo_item(self, item: TodoItem) -> None:
         """Create a new shoppinglist item."""
 
@@ -116,10 +296,64 @@ class KitchenOwlTodoListEntity(
             raise ValueError("Only active tasks may be created.")
         if item.summary is None:
             raise ValueError("Summary cannot be None")
-        await self.coordinator.kitchenowl.add_shoppinglist_item(
-            list_id=self._shoppinglist_id, item_name=item.summary
-        )
-        await self.coordinator.async_refresh()
+        self._async_add_items([item.summary])
+
+    async def async_add_items(self, items: list[str]) -> None:
+        """Add several items to the shopping list at once."""
+
+        self._async_add_items([summary for summary in items if summary.strip()])
+
+    async def async_load_recent_items(self, count: int | None = None) -> None:
+        """Show more of the recently completed items."""
+        await self.coordinator.async_load_recent_items(self._shoppinglist_id, count)
+
+    async def async_search_items(self, query: str, limit: int) -> ServiceResponse:
+        """Find the known items of the household matching a name."""
+
+        return {
+            "items": [
+                {
+                    "name": match.name,
+                    "id": match.item_id,
+                    "match": match.match,
+                    "score": round(match.score, 3),
+                }
+                for match in self.coordinator.async_search_items(query, limit)
+            ]
+        }
+
+    @callback
+    def _async_add_items(self, summaries: list[str]) -> None:
+        """Add items by name, showing them right away.
+
+        Names that only differ from a known item in case or spacing add that
+        item instead of a near-duplicate.
+        """
+
+        recent_items = {
+            i.name.casefold(): i for i in self.shopping_list["recent_items"]
+        }
+        mutations: dict[str, Mutation] = {}
+        for summary in summaries:
+            summary = self.coordinator.async_resolve_item_name(summary)
+            key = summary.casefold()
+            if key in mutations:
+                continue
+            # KitchenOwl puts a recently used item with the same name back on
+            # the list, so show that one until the server answers
+            recent_item = recent_items.get(key)
+            mutations[key] = Mutation(
+                action=ACTION_ADD,
+                list_id=self._shoppinglist_id,
+                item_id=recent_item.id
+                if recent_item is not None
+                else self.coordinator.next_local_id(),
+                name=summary,
+            )
+        if mutations:
+            self.coordinator.async_mutate(
+                self._shoppinglist_id, list(mutations.values())
+            )
 
     async def async_update_todo_item(self, item: TodoItem) -> None:
         """Update an existing shoppinglist item."""
@@ -127,67 +361,186 @@ class KitchenOwlTodoListEntity(
         if item.uid is None:
             raise KeyError("uid not set")
 
-        current_item = next(
-            (
-                _convert_kitchenowl_item_to_todo(
-                    i, i in self.shopping_list["recent_items"]
-                )
-                for i in self.shopping_list["items"]
-                + self.shopping_list["recent_items"]
-                if str(i["id"]) == item.uid
-            ),
-            None,
+        try:
+            # Items that are only known locally have negative ids
+            item_id = int(item.uid)
+        except ValueError:
+            raise ServiceValidationError(
+                f"Item {item.uid} is not on the shopping list"
+            ) from None
+        current = self.shopping_list["item_index"].get(item_id)
+        if current is None:
+            return
+        current_raw_item, current_completed = current
+        current_item = _convert_kitchenowl_item_to_todo(
+            current_raw_item, current_completed
         )
+
+        base = MutationBase(
+            name=current_raw_item.name,
+            description=current_raw_item.description,
+            completed=current_completed,
+        )
+        # The mutations are sent in this order, rapid repeated changes of the
+        # same kind to the item are coalesced by the batcher
+        mutations: list[Mutation] = []
+
         # change the item on summary change - only if completed
         if (
-            current_item is not None
-            and current_item.summary != item.summary
+            current_item.summary != item.summary
             and item.status != TodoItemStatus.COMPLETED
         ):
             if item.summary is None:
                 raise ValueError("Summary cannot be None")
-            kitchenowl_item = KitchenOwlItem(id=int(item.uid), name=item.summary)
-            await self.coordinator.kitchenowl.update_item(
-                item_id=int(item.uid), item=kitchenowl_item
+            mutations.append(
+                Mutation(
+                    action=ACTION_RENAME,
+                    list_id=self._shoppinglist_id,
+                    item_id=item_id,
+                    name=item.summary,
+                    base=base,
+                )
             )
 
-        if current_item is not None and current_item.description != item.description:
-            await self.coordinator.kitchenowl.update_shoppinglist_item_description(
-                list_id=self._shoppinglist_id,
-                item_id=int(item.uid),
-                item_description=item.description
-                if item.description is not None
-                else "",
+        if current_item.description != item.description:
+            mutations.append(
+                Mutation(
+                    action=ACTION_DESCRIPTION,
+                    list_id=self._shoppinglist_id,
+                    item_id=item_id,
+                    description=item.description
+                    if item.description is not None
+                    else "",
+                    base=base,
+                )
             )
 
-        if current_item is not None and current_item.status != item.status:
+        if current_item.status != item.status:
             if item.status == TodoItemStatus.COMPLETED:
-                await self.coordinator.kitchenowl.remove_shoppinglist_item(
-                    list_id=self._shoppinglist_id,
-                    item_id=int(item.uid),
+                mutations.append(
+                    Mutation(
+                        action=ACTION_COMPLETE,
+                        list_id=self._shoppinglist_id,
+                        item_id=item_id,
+                        base=base,
+                    )
                 )
             else:  # set the item back on the list
                 if item.summary is None:
                     raise ValueError("Summary cannot be None")
-                await self.coordinator.kitchenowl.add_shoppinglist_item(
+                mutations.append(
+                    Mutation(
+                        action=ACTION_UNCOMPLETE,
+                        list_id=self._shoppinglist_id,
+                        item_id=item_id,
+                        name=item.summary,
+                        description=item.description
+                        if item.description is not None
+                        else "",
+                        base=base,
+                    )
+                )
+
+        if mutations:
+            self.coordinator.async_mutate(self._shoppinglist_id, mutations)
+
+    def _open_item_id(self, uid: str) -> int:
+        """Return the id of an item that is on the list."""
+
+        error = HomeAssistantError(f"Item {uid} is not on the shopping list")
+        try:
+            item_id = int(uid)
+        except ValueError:
+            raise error from None
+        if item_id not in self._order:
+            raise error
+        return item_id
+
+    async def async_move_todo_item(
+        self, uid: str, previous_uid: str | None = None
+    ) -> None:
+        """Move an open item behind another one, or to the front.
+
+        Only the orderings that need to change are sent, usually just the
+        one of the moved item.
+        """
+
+        self._update_todo_items()
+        item_id = self._open_item_id(uid)
+        previous_id = (
+            self._open_item_id(previous_uid) if previous_uid is not None else None
+        )
+        if item_id == previous_id:
+            return
+
+        item_index = self.shopping_list["item_index"]
+        self.coordinator.async_mutate(
+            self._shoppinglist_id,
+            [
+                Mutation(
+                    action=ACTION_MOVE,
                     list_id=self._shoppinglist_id,
-                    item_name=item.summary,
-                    item_description=item.description
-                    if item.description is not None
-                    else "",
+                    item_id=moved_id,
+                    name=item_index[moved_id][0].name,
+                    ordering=ordering,
                 )
-        await self.coordinator.async_refresh()
+                for moved_id, ordering in self._order.plan_move(
+                    item_id, previous_id
+                ).items()
+            ],
+        )
 
     async def async_delete_todo_items(self, uids: list[str]) -> None:
         """Remove a shoppinglist item from the list."""
 
-        await asyncio.gather(
-            *[self.coordinator.kitchenowl.delete_item(item_id=int(uid)) for uid in uids]
+        self.coordinator.async_mutate(
+            self._shoppinglist_id,
+            [
+                Mutation(
+                    action=ACTION_DELETE,
+                    list_id=self._shoppinglist_id,
+                    item_id=int(uid),
+                )
+                for uid in dict.fromkeys(uids)
+            ],
         )
-        await self.coordinator.async_refresh()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the items or the availability changed.
+
+        Data that was replaced, e.g. by a refetch, but has no item changes is
+        not written again.
+        """
+
+        if self._list_deleted:
+            return
+        list_data = self.coordinator.data[self._shoppinglist_id]
+        available = self.available
+        if available == self._written_available and (
+            list_data is self._written_list_data
+            or (
+                self._written_list_data is not None
+                and not self.coordinator.async_list_changes(
+                    self._shoppinglist_id, self._written_list_data, list_data
+                )
+            )
+        ):
+            self._written_list_data = list_data
+            self.coordinator.state_writes.skipped += 1
+            return
+        self._written_list_data = list_data
+        self._written_available = available
+        self.coordinator.state_writes.written += 1
+        super()._handle_coordinator_update()
 
     async def async_added_to_hass(self) -> None:
         """Update when the list is added to hass."""
 
         await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_list_listener(
+                self._shoppinglist_id, self._handle_coordinator_update
+            )
+        )
         self._handle_coordinator_update()
@@ -0,0 +1,80 @@
+"""Fixtures of the benchmarks against the stand-in KitchenOwl server.
+
+The size of the generated data and the latency of the server can be set
+with the environment variables below; the defaults keep the benchmarks fast
+enough to run with the tests. The results are printed after the test run
+and written as JSON to ``KITCHENOWL_BENCH_OUTPUT`` if set.
+"""
+
+from collections.abc import AsyncGenerator
+import json
+import os
+from typing import Any
+
+import pytest
+
+from .server import StandInKitchenOwlServer
+
+HOUSEHOLDS = int(os.environ.get("KITCHENOWL_BENCH_HOUSEHOLDS", "2"))
+LISTS_PER_HOUSEHOLD = int(os.environ.get("KITCHENOWL_BENCH_LISTS", "3"))
+ITEMS_PER_LIST = int(os.environ.get("KITCHENOWL_BENCH_ITEMS", "200"))
+# Latency of every request in milliseconds
+LATENCY = float(os.environ.get("KITCHENOWL_BENCH_LATENCY", "5")) / 1000
+ROUNDS = int(os.environ.get("KITCHENOWL_BENCH_ROUNDS", "5"))
+
+_RESULTS: dict[str, dict[str, Any]] = {}
+
+
+@pytest.fixture
+def embed_items() -> bool:
+    """Return whether the server sends the items along with the lists."""
+    return False
+
+
+@pytest.fixture
+async def bench_server(
+    socket_enabled, embed_items: bool
+) -> AsyncGenerator[StandInKitchenOwlServer]:
+    """Run a stand-in KitchenOwl server with the configured data."""
+
+    server = StandInKitchenOwlServer(
+        households=HOUSEHOLDS,
+        lists_per_household=LISTS_PER_HOUSEHOLD,
+        items_per_list=ITEMS_PER_LIST,
+        recent_items_per_list=ITEMS_PER_LIST,
+        latency=LATENCY,
+        embed_items=embed_items,
+    )
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def bench_report(request: pytest.FixtureRequest) -> dict[str, Any]:
+    """Return the dict the results of a benchmark are recorded in."""
+    return _RESULTS.setdefault(request.node.name, {})
+
+
+def pytest_terminal_summary(terminalreporter: Any) -> None:
+    """Print the benchmark results."""
+
+    if not _RESULTS:
+        return
+    terminalreporter.section("KitchenOwl benchmarks")
+    terminalreporter.write_line(
+        f"{HOUSEHOLDS} households, {LISTS_PER_HOUSEHOLD} lists each, "
+        f"{ITEMS_PER_LIST} items and recent items per list, "
+        f"{LATENCY * 1000:g} ms latency"
+    )
+    for name, results in _RESULTS.items():
+        terminalreporter.write_line(f"{name}:")
+        for key, value in results.items():
+            terminalreporter.write_line(
+                f"  {key}: {value:.3f}"
+                if isinstance(value, float)
+                else f"  {key}: {value}"
+            )
+    if output := os.environ.get("KITCHENOWL_BENCH_OUTPUT"):
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(_RESULTS, file, indent=2)
@@ -0,0 +1,234 @@
+"""A local stand-in for the KitchenOwl API used by the benchmarks."""
+
+import asyncio
+from collections import Counter
+from collections.abc import Iterator
+import itertools
+from typing import Any
+
+from aiohttp import web
+
+TOKEN = "benchmark-token"
+
+
+def generate_items(ids: Iterator[int], count: int, prefix: str) -> list[dict[str, Any]]:
+    """Return items with all the fields KitchenOwl sends for an item."""
+
+    items = []
+    for number in range(count):
+        item_id = next(ids)
+        items.append(
+            {
+                "id": item_id,
+                "name": f"{prefix} {item_id}",
+                "description": "1 kg" if number % 3 == 0 else "",
+                "ordering": number,
+                "category": {
+                    "id": number % 12,
+                    "name": f"Category {number % 12}",
+                    "ordering": number % 12,
+                    "household_id": 1,
+                    "default": False,
+                    "default_key": None,
+                    "created_at": 1700000000000,
+                    "updated_at": 1700000000000,
+                },
+                "category_id": number % 12,
+                "household_id": 1,
+                "icon": "carrot" if number % 2 else None,
+                "default": False,
+                "default_key": None,
+                "support": number % 5,
+                "created_at": 1700000000000 + number,
+                "updated_at": 1700000000000 + number,
+            }
+        )
+    return items
+
+
+class StandInKitchenOwlServer:
+    """Serve generated households, shopping lists and items.
+
+    Every API request is counted by route and delayed by ``latency`` seconds
+    to stand in for the network and the server. With ``embed_items`` the
+    items and recent items are sent along with the shopping lists, like
+    servers that support it do.
+    """
+
+    def __init__(
+        self,
+        households: int = 1,
+        lists_per_household: int = 1,
+        items_per_list: int = 10,
+        recent_items_per_list: int = 10,
+        latency: float = 0.0,
+        embed_items: bool = False,
+    ) -> None:
+        """Generate the data of the server."""
+
+        self.latency = latency
+        self.embed_items = embed_items
+        self.requests: Counter[str] = Counter()
+        self.url = ""
+        ids = itertools.count(1)
+        self._item_ids = itertools.count(1_000_000)
+        self.households = [
+            {"id": household_id, "name": f"Household {household_id}"}
+            for household_id in range(1, households + 1)
+        ]
+        self.lists: dict[int, dict[str, Any]] = {}
+        for household in self.households:
+            for number in range(1, lists_per_household + 1):
+                list_id = next(ids)
+                self.lists[list_id] = {
+                    "shopping_list": {
+                        "id": list_id,
+                        "name": f"List {household['id']}-{number}",
+                        "household_id": household["id"],
+                    },
+                    "items": {
+                        item["id"]: item
+                        for item in generate_items(
+                            self._item_ids, items_per_list, "Item"
+                        )
+                    },
+                    "recent_items": {
+                        item["id"]: item
+                        for item in generate_items(
+                            self._item_ids, recent_items_per_list, "Recent"
+                        )
+                    },
+                }
+
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/user", self._user)
+        app.router.add_get("/api/household", self._households)
+        app.router.add_get(
+            "/api/household/{household_id}/shoppinglist", self._shopping_lists
+        )
+        app.router.add_get("/api/shoppinglist/{list_id}/items", self._items)
+        app.router.add_get(
+            "/api/shoppinglist/{list_id}/recent-items", self._recent_items
+        )
+        app.router.add_post(
+            "/api/shoppinglist/{list_id}/add-item-by-name", self._add_item
+        )
+        app.router.add_post(
+            "/api/shoppinglist/{list_id}/item/{item_id}", self._update_description
+        )
+        app.router.add_delete("/api/shoppinglist/{list_id}/item", self._remove_item)
+        app.router.add_post("/api/item/{item_id}", self._update_item)
+        app.router.add_delete("/api/item/{item_id}", self._delete_item)
+        self._runner = web.AppRunner(app)
+
+    async def start(self) -> None:
+        """Start listening on a random local port."""
+
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        await self._runner.cleanup()
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of API requests served."""
+        return self.requests.total()
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        if request.headers.get("Authorization") != f"Bearer {TOKEN}":
+            raise web.HTTPUnauthorized
+        route = request.match_info.route.resource
+        self.requests[
+            f"{request.method} {route.canonical if route is not None else request.path}"
+        ] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    def _list(self, request: web.Request) -> dict[str, Any]:
+        try:
+            return self.lists[int(request.match_info["list_id"])]
+        except KeyError:
+            raise web.HTTPNotFound from None
+
+    async def _user(self, request: web.Request) -> web.Response:
+        return web.json_response({"id": 1, "name": "Benchmark", "username": "bench"})
+
+    async def _households(self, request: web.Request) -> web.Response:
+        return web.json_response(self.households)
+
+    async def _shopping_lists(self, request: web.Request) -> web.Response:
+        household_id = int(request.match_info["household_id"])
+        return web.json_response(
+            [
+                {
+                    **lst["shopping_list"],
+                    "items": list(lst["items"].values()),
+                    "recentItems": list(lst["recent_items"].values()),
+                }
+                if self.embed_items
+                else lst["shopping_list"]
+                for lst in self.lists.values()
+                if lst["shopping_list"]["household_id"] == household_id
+            ]
+        )
+
+    async def _items(self, request: web.Request) -> web.Response:
+        return web.json_response(list(self._list(request)["items"].values()))
+
+    async def _recent_items(self, request: web.Request) -> web.Response:
+        return web.json_response(list(self._list(request)["recent_items"].values()))
+
+    async def _add_item(self, request: web.Request) -> web.Response:
+        lst = self._list(request)
+        data = await request.json()
+        for item in itertools.chain(
+            lst["items"].values(), lst["recent_items"].values()
+        ):
+            if item["name"].casefold() == data["name"].casefold():
+                lst["recent_items"].pop(item["id"], None)
+                break
+        else:
+            item = {"id": next(self._item_ids), "name": data["name"]}
+        item["description"] = data.get("description") or ""
+        lst["items"][item["id"]] = item
+        return web.json_response(item)
+
+    async def _update_description(self, request: web.Request) -> web.Response:
+        item = self._list(request)["items"][int(request.match_info["item_id"])]
+        item["description"] = (await request.json())["description"]
+        return web.json_response(item)
+
+    async def _remove_item(self, request: web.Request) -> web.Response:
+        lst = self._list(request)
+        item = lst["items"].pop((await request.json())["item_id"], None)
+        if item is not None:
+            lst["recent_items"][item["id"]] = item
+        return web.json_response({})
+
+    def _find_item(self, item_id: int) -> dict[str, Any]:
+        for lst in self.lists.values():
+            for items in (lst["items"], lst["recent_items"]):
+                if item_id in items:
+                    return items[item_id]
+        raise web.HTTPNotFound
+
+    async def _update_item(self, request: web.Request) -> web.Response:
+        item = self._find_item(int(request.match_info["item_id"]))
+        item["name"] = (await request.json())["name"]
+        return web.json_response(item)
+
+    async def _delete_item(self, request: web.Request) -> web.Response:
+        item_id = int(request.match_info["item_id"])
+        for lst in self.lists.values():
+            lst["items"].pop(item_id, None)
+            lst["recent_items"].pop(item_id, None)
+        return web.json_response({})
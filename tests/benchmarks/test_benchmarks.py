@@ -0,0 +1,307 @@
+"""Benchmarks of refreshes, mutations and rendering against a stand-in server."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+import gc
+import itertools
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.todo import DOMAIN as TODO_DOMAIN, TodoServices
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_ACCESS_TOKEN,
+    CONF_HOST,
+    CONF_VERIFY_SSL,
+)
+from homeassistant.core import HomeAssistant
+
+from custom_components.kitchenowl.catalog import ItemCatalog
+from custom_components.kitchenowl.const import (
+    ATTR_ITEMS,
+    CONF_HOUSEHOLD,
+    DOMAIN,
+    SERVICE_ADD_ITEMS,
+)
+from custom_components.kitchenowl.coordinator import parse_shopping_list_data
+from custom_components.kitchenowl.push import KitchenOwlPushClient
+
+from .conftest import HOUSEHOLDS, LISTS_PER_HOUSEHOLD, ROUNDS
+from .server import TOKEN, StandInKitchenOwlServer, generate_items
+
+
+async def _async_no_push(self: KitchenOwlPushClient) -> None:
+    """Stand in for the realtime connection."""
+
+
+@pytest.fixture
+async def entries(
+    hass: HomeAssistant, bench_server: StandInKitchenOwlServer
+) -> AsyncGenerator[list[MockConfigEntry]]:
+    """Set up a config entry for every household of the stand-in server.
+
+    Realtime push updates are not part of the benchmarks and stay off.
+    """
+
+    entries = []
+    for household in bench_server.households:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=household["name"],
+            unique_id=f"1_{household['id']}",
+            version=0,
+            minor_version=1,
+            data={
+                CONF_HOST: bench_server.url,
+                CONF_ACCESS_TOKEN: TOKEN,
+                CONF_VERIFY_SSL: False,
+                CONF_HOUSEHOLD: str(household["id"]),
+            },
+        )
+        entry.add_to_hass(hass)
+        with patch.object(KitchenOwlPushClient, "async_run", _async_no_push):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+    yield entries
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def _async_send_mutations(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    # Let the mutations reach the batcher, then send them without waiting
+    await asyncio.sleep(0)
+    await entry.runtime_data.batcher.async_flush()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_refresh(
+    entries: list[MockConfigEntry],
+    bench_server: StandInKitchenOwlServer,
+    bench_report: dict[str, Any],
+) -> None:
+    """Measure the wall time and requests of refreshing all households."""
+
+    coordinators = [entry.runtime_data for entry in entries]
+    bench_server.requests.clear()
+    durations = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        durations.append(time.perf_counter() - start)
+
+    requests_per_refresh = bench_server.total_requests / ROUNDS
+    bench_report["median_wall_time_s"] = statistics.median(durations)
+    bench_report["min_wall_time_s"] = min(durations)
+    bench_report["requests_per_refresh"] = requests_per_refresh
+    # The households of a user share the session of their connection
+    pool = coordinators[0].session_statistics
+    bench_report["connections_created"] = pool.connections_created
+    bench_report["connections_reused"] = pool.connections_reused
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+    assert requests_per_refresh == HOUSEHOLDS * (1 + 2 * LISTS_PER_HOUSEHOLD)
+
+
+@pytest.mark.parametrize("embed_items", [True])
+async def test_bulk_refresh(
+    entries: list[MockConfigEntry],
+    bench_server: StandInKitchenOwlServer,
+    bench_report: dict[str, Any],
+) -> None:
+    """Measure refreshing all households from a server sending items with the lists."""
+
+    coordinators = [entry.runtime_data for entry in entries]
+    assert all(coordinator.bulk_refresh for coordinator in coordinators)
+    bench_server.requests.clear()
+    durations = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        durations.append(time.perf_counter() - start)
+
+    requests_per_refresh = bench_server.total_requests / ROUNDS
+    bench_report["median_wall_time_s"] = statistics.median(durations)
+    bench_report["min_wall_time_s"] = min(durations)
+    bench_report["requests_per_refresh"] = requests_per_refresh
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+    assert requests_per_refresh == HOUSEHOLDS
+
+
+async def test_requests_per_mutation(
+    hass: HomeAssistant,
+    entries: list[MockConfigEntry],
+    bench_server: StandInKitchenOwlServer,
+    bench_report: dict[str, Any],
+) -> None:
+    """Measure the requests sent for todo actions."""
+
+    entity_id = sorted(hass.states.async_entity_ids(TODO_DOMAIN))[0]
+    items = (
+        await hass.services.async_call(
+            TODO_DOMAIN,
+            TodoServices.GET_ITEMS,
+            {},
+            target={ATTR_ENTITY_ID: entity_id},
+            blocking=True,
+            return_response=True,
+        )
+    )[entity_id]["items"]
+    open_items = [item for item in items if item["status"] == "needs_action"]
+
+    async def count_requests(domain: str, service: str, data: dict) -> int:
+        bench_server.requests.clear()
+        await hass.services.async_call(
+            domain, service, data, target={ATTR_ENTITY_ID: entity_id}, blocking=True
+        )
+        await _async_send_mutations(hass, entries[0])
+        return bench_server.total_requests
+
+    bench_report["complete_item"] = await count_requests(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": open_items[0]["uid"], "status": "completed"},
+    )
+    bench_report["rename_item"] = await count_requests(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": open_items[1]["uid"], "rename": "Renamed"},
+    )
+    bench_report["add_10_items"] = await count_requests(
+        DOMAIN, SERVICE_ADD_ITEMS, {ATTR_ITEMS: [f"New {i}" for i in range(10)]}
+    )
+    bench_report["delete_item"] = await count_requests(
+        TODO_DOMAIN, TodoServices.REMOVE_ITEM, {"item": [open_items[2]["uid"]]}
+    )
+
+    assert bench_report["complete_item"] == 1
+    assert bench_report["rename_item"] == 1
+    assert bench_report["delete_item"] == 1
+
+
+async def test_todo_items_render(
+    hass: HomeAssistant,
+    entries: list[MockConfigEntry],
+    bench_report: dict[str, Any],
+) -> None:
+    """Measure the cost of converting a list to todo items."""
+
+    entity_id = sorted(hass.states.async_entity_ids(TODO_DOMAIN))[0]
+    entity = hass.data[TODO_DOMAIN].get_entity(entity_id)
+    list_data = entity.shopping_list
+    item_count = len(list_data["items"]) + len(list_data["recent_items"])
+    rounds = ROUNDS * 10
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        # Drop the cached items to measure a full conversion
+        entity._todo_items_source = None
+        entity.todo_items  # noqa: B018
+    render = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        entity.todo_items  # noqa: B018
+    cached = (time.perf_counter() - start) / rounds
+
+    bench_report["render_ms"] = render * 1000
+    bench_report["render_ms_per_1k_items"] = render * 1000 / item_count * 1000
+    bench_report["cached_render_ms"] = cached * 1000
+    assert len(entity.todo_items) == item_count
+
+
+async def test_memory_per_1k_items(
+    entries: list[MockConfigEntry], bench_report: dict[str, Any]
+) -> None:
+    """Measure the memory the coordinator data takes per 1000 items."""
+
+    coordinator = entries[0].runtime_data
+    previous = coordinator.data
+    # Without previous data every list is built from the fetched items
+    coordinator.data = None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        data = await coordinator._async_update_data()
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+        coordinator.data = previous
+
+    item_count = sum(
+        len(list_data["items"]) + len(list_data["recent_items"])
+        for list_data in data.values()
+    )
+    bench_report["items"] = item_count
+    bench_report["kib_per_1k_items"] = used / item_count * 1000 / 1024
+
+
+async def test_memory_10k_items(bench_report: dict[str, Any]) -> None:
+    """Compare the memory of 10k items as received and as kept by the coordinator."""
+
+    ids = itertools.count(1)
+    payload = json.dumps(generate_items(ids, 5000, "Item"))
+    recent_payload = json.dumps(generate_items(ids, 5000, "Recent"))
+    shopping_list = {"id": 1, "name": "Groceries", "household_id": 1}
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        items = json.loads(payload)
+        recent_items = json.loads(recent_payload)
+        gc.collect()
+        received = tracemalloc.get_traced_memory()[0] - baseline
+
+        list_data = parse_shopping_list_data(shopping_list, items, recent_items)
+        del items, recent_items
+        gc.collect()
+        kept = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    bench_report["items"] = len(list_data["item_index"])
+    bench_report["received_kib"] = received / 1024
+    bench_report["kept_kib"] = kept / 1024
+    bench_report["kept_bytes_per_item"] = kept / len(list_data["item_index"])
+    assert kept < received
+
+
+async def test_catalog_search_10k_items(bench_report: dict[str, Any]) -> None:
+    """Measure indexing and searching the names of 10k items."""
+
+    ids = itertools.count(1)
+    list_data = parse_shopping_list_data(
+        {"id": 1, "name": "Groceries", "household_id": 1},
+        generate_items(ids, 5000, "Item"),
+        generate_items(ids, 5000, "Recent"),
+    )
+    catalog = ItemCatalog()
+
+    start = time.perf_counter()
+    catalog.update({1: list_data})
+    bench_report["index_ms"] = (time.perf_counter() - start) * 1000
+
+    queries = ["item 100", "recnt 5321", "Item 12345", "nothing like it"]
+    rounds = ROUNDS * 10
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            catalog.search(query)
+    bench_report["search_ms"] = (
+        (time.perf_counter() - start) / rounds / len(queries) * 1000
+    )
+    assert len(catalog) == 10000
+    assert catalog.search("recnt 5321")[0].name == "Recent 5321"
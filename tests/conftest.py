@@ -0,0 +1,88 @@
+"""Global fixtures for the KitchenOwl integration tests."""
+
+from collections.abc import Generator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_HOST, CONF_VERIFY_SSL
+from homeassistant.core import HomeAssistant
+
+from custom_components.kitchenowl.const import CONF_HOUSEHOLD, DOMAIN
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations in all tests."""
+    yield
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay() -> Generator[None]:
+    """Retry failed requests right away."""
+    with patch("custom_components.kitchenowl.resilience.RETRY_BASE_DELAY", 0):
+        yield
+
+
+async def _async_no_push() -> None:
+    """Stand in for the realtime connection, which is not used in tests."""
+
+
+@pytest.fixture
+def mock_kitchenowl() -> Generator[AsyncMock]:
+    """Return a mocked KitchenOwl client with one household and one list."""
+
+    with (
+        patch(
+            "custom_components.kitchenowl.KitchenOwl", autospec=True
+        ) as kitchenowl_class,
+        patch(
+            "custom_components.kitchenowl.connection.KitchenOwlPushClient",
+            autospec=True,
+        ) as push_client_class,
+    ):
+        push_client_class.return_value.async_run = _async_no_push
+        push_client_class.return_value.connected = False
+        kitchenowl = kitchenowl_class.return_value
+        kitchenowl.get_households.return_value = [{"id": 1, "name": "Home"}]
+        kitchenowl.get_shoppinglists.return_value = [
+            {"id": 1, "name": "Groceries", "household_id": 1}
+        ]
+        kitchenowl.get_shoppinglist_items.return_value = [
+            {"id": 7, "name": "Milk", "description": ""}
+        ]
+        kitchenowl.get_shoppinglist_recent_items.return_value = [
+            {"id": 8, "name": "Bread", "description": "whole grain"}
+        ]
+        yield kitchenowl
+
+
+@pytest.fixture
+def config_entry() -> MockConfigEntry:
+    """Return a KitchenOwl config entry."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="KitchenOwl",
+        unique_id="1_1",
+        version=0,
+        minor_version=1,
+        data={
+            CONF_HOST: "http://kitchenowl.local",
+            CONF_ACCESS_TOKEN: "test-token",
+            CONF_VERIFY_SSL: True,
+            CONF_HOUSEHOLD: "1",
+        },
+    )
+
+
+@pytest.fixture
+async def init_integration(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> MockConfigEntry:
+    """Set up the KitchenOwl integration."""
+
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
@@ -0,0 +1,71 @@
+"""Test the KitchenOwl item catalog."""
+
+from custom_components.kitchenowl.catalog import (
+    MATCH_EXACT,
+    MATCH_FUZZY,
+    MATCH_PREFIX,
+    ItemCatalog,
+)
+from custom_components.kitchenowl.coordinator import build_shopping_list_data
+from custom_components.kitchenowl.models import ShoppingListItem
+
+SHOPPING_LIST = {"id": 1, "name": "Groceries", "household_id": 1}
+
+
+def _list_data(*names: str, recent: tuple[str, ...] = ()):
+    ids = iter(range(1, 100))
+    return build_shopping_list_data(
+        SHOPPING_LIST,
+        [ShoppingListItem(next(ids), name) for name in names],
+        [ShoppingListItem(next(ids), name) for name in recent],
+    )
+
+
+def test_search() -> None:
+    """Test exact, prefix and fuzzy matches are found in that order."""
+
+    catalog = ItemCatalog()
+    catalog.update(
+        {1: _list_data("Milk", "Oat Milk", recent=("Tomatoes", "Milk chocolate"))}
+    )
+
+    assert [(m.name, m.match) for m in catalog.search("milk")] == [
+        ("Milk", MATCH_EXACT),
+        ("Milk chocolate", MATCH_PREFIX),
+        ("Oat Milk", MATCH_PREFIX),
+    ]
+    assert [(m.name, m.match) for m in catalog.search("  TOMATOS ")] == [
+        ("Tomatoes", MATCH_FUZZY)
+    ]
+    assert catalog.search("milk", limit=1)[0].name == "Milk"
+    assert catalog.search("") == []
+
+
+def test_incremental_update() -> None:
+    """Test only replaced lists are indexed again and names are reference counted."""
+
+    catalog = ItemCatalog()
+    groceries = _list_data("Milk", "Bread")
+    catalog.update({1: groceries, 2: _list_data("Milk")})
+    assert len(catalog) == 2
+
+    catalog.update({1: _list_data("Bread"), 2: _list_data("Milk")})
+    assert catalog.search("milk")[0].name == "Milk"
+
+    catalog.update({1: groceries})
+    assert len(catalog) == 2
+    catalog.update({})
+    assert len(catalog) == 0
+    assert catalog.search("milk") == []
+
+
+def test_resolve() -> None:
+    """Test names resolve to an existing item only ignoring case and spacing."""
+
+    catalog = ItemCatalog()
+    catalog.update({1: _list_data("Tomatoes", "Oat milk", "Cheese 20%")})
+
+    assert catalog.resolve(" OAT  Milk").name == "Oat milk"
+    assert catalog.resolve("tomatos") is None
+    assert catalog.resolve("Goat milk") is None
+    assert catalog.resolve("Cheese 30%") is None
@@ -0,0 +1,94 @@
+"""Test the KitchenOwl config flow."""
+
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_HOST,
+    CONF_VERIFY_SSL,
+    EVENT_HOMEASSISTANT_CLOSE,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.kitchenowl.const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_RECENT_ITEMS_LIMIT,
+    DOMAIN,
+)
+
+
+async def test_options_flow(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test the polling and recent items options can be changed."""
+
+    result = await hass.config_entries.options.async_init(init_integration.entry_id)
+    assert result["type"] is FlowResultType.FORM
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_MIN_SCAN_INTERVAL: 600,
+            CONF_MAX_SCAN_INTERVAL: 60,
+            CONF_MAX_CONCURRENT_REQUESTS: 2,
+        },
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "min_above_max_scan_interval"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_MIN_SCAN_INTERVAL: 20,
+            CONF_MAX_SCAN_INTERVAL: 60,
+            CONF_MAX_CONCURRENT_REQUESTS: 2,
+            CONF_RECENT_ITEMS_LIMIT: 50,
+        },
+    )
+    await hass.async_block_till_done()
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert init_integration.options == {
+        CONF_MIN_SCAN_INTERVAL: 20,
+        CONF_MAX_SCAN_INTERVAL: 60,
+        CONF_MAX_CONCURRENT_REQUESTS: 2,
+        CONF_RECENT_ITEMS_LIMIT: 50,
+    }
+    assert init_integration.runtime_data.update_interval.total_seconds() == 20
+
+
+async def test_user_flow_replaces_session(hass: HomeAssistant) -> None:
+    """Test every submit replaces the session of the flow and closes it."""
+
+    listeners = hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_CLOSE, 0)
+    with patch(
+        "custom_components.kitchenowl.config_flow.KitchenOwl", autospec=True
+    ) as kitchenowl_class:
+        kitchenowl_class.return_value.test_connection.side_effect = TimeoutError
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_USER}
+        )
+        for _ in range(2):
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"],
+                {
+                    CONF_HOST: "http://kitchenowl.local",
+                    CONF_ACCESS_TOKEN: "test-token",
+                    CONF_VERIFY_SSL: True,
+                },
+            )
+            assert result["errors"] == {"base": "timeout_connect"}
+    assert hass.bus.async_listeners()[EVENT_HOMEASSISTANT_CLOSE] == listeners + 1
+    (first, second) = (call.args[0] for call in kitchenowl_class.call_args_list)
+    assert first.closed
+    assert not second.closed
+
+    hass.config_entries.flow.async_abort(result["flow_id"])
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_CLOSE, 0) == listeners
+    assert second.closed
@@ -0,0 +1,382 @@
+"""Test the KitchenOwl data update coordinator."""
+
+import asyncio
+from datetime import timedelta
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+from kitchenowl_python.exceptions import KitchenOwlRequestException
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.kitchenowl.const import (
+    ACTIVITY_PERIOD,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    EVENT_ITEM_CHANGED,
+    LIST_RETRY_MIN_DELAY,
+    SCAN_INTERVAL_BACKOFF,
+    STALE_LIST_MAX_AGE,
+)
+from custom_components.kitchenowl.coordinator import KitchenOwlDataUpdateCoordinator
+from custom_components.kitchenowl.mutations import ACTION_COMPLETE, Mutation
+
+
+async def test_refresh_single_list(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a targeted refresh only fetches and notifies a single list."""
+
+    coordinator = init_integration.runtime_data
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+    mock_kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Milk", "description": ""},
+        {"id": 9, "name": "Eggs", "description": ""},
+    ]
+    list_listener = Mock()
+    other_list_listener = Mock()
+    coordinator.async_add_list_listener(1, list_listener)
+    coordinator.async_add_list_listener(2, other_list_listener)
+
+    await coordinator.async_refresh_list(1)
+
+    mock_kitchenowl.get_shoppinglists.assert_not_called()
+    mock_kitchenowl.get_shoppinglist_items.assert_awaited_with(1)
+    assert [i.id for i in coordinator.data[1]["items"]] == [7, 9]
+    list_listener.assert_called_once_with()
+    other_list_listener.assert_not_called()
+    assert hass.states.get("todo.groceries").state == "2"
+
+
+async def test_unchanged_list_data_is_kept(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a refresh keeps the data of unchanged lists identical."""
+
+    coordinator = init_integration.runtime_data
+    previous = coordinator.data[1]
+
+    await coordinator.async_refresh()
+    assert coordinator.data[1] is previous
+
+    mock_kitchenowl.get_shoppinglist_items.return_value = []
+    await coordinator.async_refresh()
+    assert coordinator.data[1] is not previous
+
+
+async def test_unchanged_list_skips_state_write(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test entities only write their state when their list changed."""
+
+    coordinator = init_integration.runtime_data
+    written = coordinator.state_writes.written
+    last_updated = hass.states.get("todo.groceries").last_updated
+
+    await coordinator.async_refresh()
+    assert coordinator.state_writes.skipped == 1
+    assert coordinator.state_writes.written == written
+    assert hass.states.get("todo.groceries").last_updated == last_updated
+
+    mock_kitchenowl.get_shoppinglist_items.return_value = []
+    await coordinator.async_refresh()
+    assert coordinator.state_writes.written == written + 1
+    assert hass.states.get("todo.groceries").state == "0"
+
+
+async def test_adaptive_update_interval(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test polling backs off while idle and speeds up after a change."""
+
+    coordinator = init_integration.runtime_data
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_MIN_SCAN_INTERVAL)
+
+    with patch(
+        "custom_components.kitchenowl.coordinator.time.monotonic",
+        return_value=time.monotonic() + ACTIVITY_PERIOD,
+    ):
+        await coordinator.async_refresh()
+        assert coordinator.update_interval == timedelta(
+            seconds=DEFAULT_MIN_SCAN_INTERVAL * SCAN_INTERVAL_BACKOFF
+        )
+        for _ in range(20):
+            await coordinator.async_refresh()
+        assert coordinator.update_interval == timedelta(
+            seconds=DEFAULT_MAX_SCAN_INTERVAL
+        )
+
+        mock_kitchenowl.get_shoppinglist_items.return_value = []
+        await coordinator.async_refresh()
+        assert coordinator.update_interval == timedelta(
+            seconds=DEFAULT_MIN_SCAN_INTERVAL
+        )
+
+
+async def test_failed_list_keeps_last_data(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a list that fails on its own stays available and is retried."""
+
+    coordinator = init_integration.runtime_data
+    mock_kitchenowl.get_shoppinglists.return_value = [
+        {"id": 1, "name": "Groceries", "household_id": 1},
+        {"id": 2, "name": "Hardware", "household_id": 1},
+    ]
+    await coordinator.async_refresh()
+
+    async def get_items(list_id: int) -> list[dict]:
+        if list_id == 1:
+            raise KitchenOwlRequestException
+        return []
+
+    mock_kitchenowl.get_shoppinglist_items.side_effect = get_items
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert [i.id for i in coordinator.data[1]["items"]] == [7]
+    assert coordinator.data[2]["items"] == []
+    assert 1 in coordinator.stale_since
+    assert hass.states.get("todo.groceries").state == "1"
+
+    mock_kitchenowl.get_shoppinglist_items.side_effect = None
+    mock_kitchenowl.get_shoppinglist_items.return_value = []
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=LIST_RETRY_MIN_DELAY)
+    )
+    await hass.async_block_till_done()
+    assert not coordinator.stale_since
+    assert hass.states.get("todo.groceries").state == "0"
+
+    coordinator.stale_since[1] = dt_util.utcnow() - STALE_LIST_MAX_AGE
+    coordinator.async_update_list_listeners(1)
+    assert hass.states.get("todo.groceries").state == STATE_UNAVAILABLE
+
+
+async def test_requests_are_limited(hass: HomeAssistant) -> None:
+    """Test no more requests than allowed are running at the same time."""
+
+    kitchenowl = AsyncMock()
+    kitchenowl.get_shoppinglists.return_value = [
+        {"id": list_id, "name": f"List {list_id}", "household_id": 1}
+        for list_id in range(1, 6)
+    ]
+    finished = 0
+    peak = 0
+
+    async def get_items(list_id: int) -> list[dict]:
+        nonlocal finished, peak
+        # A request counts from the moment it is created
+        created = (
+            kitchenowl.get_shoppinglist_items.call_count
+            + kitchenowl.get_shoppinglist_recent_items.call_count
+        )
+        peak = max(peak, created - finished)
+        await asyncio.sleep(0)
+        finished += 1
+        return []
+
+    kitchenowl.get_shoppinglist_items.side_effect = get_items
+    kitchenowl.get_shoppinglist_recent_items.side_effect = get_items
+    coordinator = KitchenOwlDataUpdateCoordinator(
+        hass, kitchenowl, "1", max_concurrent_requests=2
+    )
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert len(coordinator.data) == 5
+    assert finished == 10
+    assert peak == 2
+
+
+async def test_concurrent_refreshes_share_fetches(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a burst of refreshes collapses into one running and one trailing fetch.
+
+    Full refreshes only wait for a trailing fetch after changes were sent.
+    """
+
+    coordinator = init_integration.runtime_data
+    release = asyncio.Event()
+    items = [{"id": 7, "name": "Milk", "description": ""}]
+
+    async def get_items(list_id: int) -> list[dict]:
+        await release.wait()
+        return list(items)
+
+    mock_kitchenowl.get_shoppinglist_items.reset_mock()
+    mock_kitchenowl.get_shoppinglist_items.side_effect = get_items
+
+    first = hass.async_create_task(coordinator.async_refresh_list(1))
+    await asyncio.sleep(0)
+    # Changed after the first fetch started, the later callers must see it
+    items.append({"id": 9, "name": "Eggs", "description": ""})
+    burst = [
+        hass.async_create_task(coordinator.async_refresh_list(1)) for _ in range(5)
+    ]
+    retry = hass.async_create_task(coordinator.async_refresh_list(1, fresh=False))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, retry, *burst)
+
+    assert mock_kitchenowl.get_shoppinglist_items.await_count == 2
+    assert [i.id for i in coordinator.data[1]["items"]] == [7, 9]
+    assert coordinator.coalesced_refreshes == 5
+
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+    release.clear()
+    refreshes = [hass.async_create_task(coordinator.async_refresh()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*refreshes)
+
+    # Polls join the running fetch
+    assert mock_kitchenowl.get_shoppinglists.await_count == 1
+    assert coordinator.last_update_success
+
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+    release.clear()
+    poll = hass.async_create_task(coordinator.async_refresh())
+    await asyncio.sleep(0)
+    after_changes = hass.async_create_task(coordinator.async_refresh_after_changes())
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(poll, after_changes)
+
+    assert mock_kitchenowl.get_shoppinglists.await_count == 2
+
+
+async def test_item_changes_fire_events(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test every changed item fires an event."""
+
+    coordinator = init_integration.runtime_data
+    events = async_capture_events(hass, EVENT_ITEM_CHANGED)
+    mock_kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Oat milk", "description": ""},
+        {"id": 8, "name": "Bread", "description": "whole grain"},
+    ]
+    mock_kitchenowl.get_shoppinglist_recent_items.return_value = []
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data for event in events] == [
+        {
+            "config_entry_id": init_integration.entry_id,
+            "household_id": "1",
+            "list_id": 1,
+            "item_id": 7,
+            "change": "renamed",
+            "name": "Oat milk",
+            "completed": False,
+            "previous_name": "Milk",
+            "pending": False,
+        },
+        {
+            "config_entry_id": init_integration.entry_id,
+            "household_id": "1",
+            "list_id": 1,
+            "item_id": 8,
+            "change": "uncompleted",
+            "name": "Bread",
+            "completed": False,
+            "pending": False,
+        },
+    ]
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(events) == 2
+
+    # Shown before the server confirmed it
+    coordinator.async_mutate(
+        1, [Mutation(action=ACTION_COMPLETE, list_id=1, item_id=7)]
+    )
+    assert events[2].data["change"] == "completed"
+    assert events[2].data["pending"]
+    await coordinator.batcher.async_flush()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_renamed_items_are_updated_in_place(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test only renamed items are converted again, the others are kept."""
+
+    coordinator = init_integration.runtime_data
+    entity = hass.data["entity_components"]["todo"].get_entity("todo.groceries")
+    milk, bread = entity.todo_items
+    mock_kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Oat milk", "description": ""}
+    ]
+
+    await coordinator.async_refresh()
+
+    items = entity.todo_items
+    assert [item.summary for item in items] == ["Oat milk", "Bread"]
+    assert items[0] is not milk
+    assert items[1] is bread
+
+
+async def test_bulk_refresh(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test the items sent along with the lists are used if the server sends them."""
+
+    mock_kitchenowl.get_shoppinglists.return_value = [
+        {
+            "id": 1,
+            "name": "Groceries",
+            "household_id": 1,
+            "items": [{"id": 7, "name": "Milk", "description": ""}],
+            "recentItems": [{"id": 8, "name": "Bread", "description": ""}],
+        }
+    ]
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = config_entry.runtime_data
+    assert coordinator.bulk_refresh is True
+    mock_kitchenowl.get_shoppinglist_items.assert_not_called()
+    mock_kitchenowl.get_shoppinglist_recent_items.assert_not_called()
+    assert coordinator.data[1]["shopping_list"] == {
+        "id": 1,
+        "name": "Groceries",
+        "household_id": 1,
+    }
+    assert [i.id for i in coordinator.data[1]["items"]] == [7]
+    assert [i.id for i in coordinator.data[1]["recent_items"]] == [8]
+
+    # Lists the server sends without their items are fetched on their own
+    embedded_lists = mock_kitchenowl.get_shoppinglists.return_value
+    mock_kitchenowl.get_shoppinglists.return_value = [
+        {"id": 1, "name": "Groceries", "household_id": 1}
+    ]
+    mock_kitchenowl.get_shoppinglist_items.return_value = []
+    await coordinator.async_refresh()
+    mock_kitchenowl.get_shoppinglist_items.assert_awaited_once_with(1)
+    assert coordinator.data[1]["items"] == []
+
+    # More recent items than the server sends with the list are fetched
+    mock_kitchenowl.get_shoppinglists.return_value = embedded_lists
+    mock_kitchenowl.get_shoppinglist_recent_items.return_value = [
+        {"id": 8, "name": "Bread", "description": ""},
+        {"id": 10, "name": "Butter", "description": ""},
+    ]
+    mock_kitchenowl.get_shoppinglist_recent_items.reset_mock()
+    await coordinator.async_load_recent_items(1, None)
+    await coordinator.async_refresh()
+    assert mock_kitchenowl.get_shoppinglist_recent_items.await_count == 2
+    assert [i.id for i in coordinator.data[1]["recent_items"]] == [8, 10]
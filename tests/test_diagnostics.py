@@ -0,0 +1,51 @@
+"""Test the KitchenOwl diagnostics."""
+
+from unittest.mock import AsyncMock
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+)
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+
+from custom_components.kitchenowl.const import (
+    MAX_CONCURRENT_REQUESTS,
+    SESSION_EXTRA_CONNECTIONS,
+)
+
+
+async def test_diagnostics(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    init_integration: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+) -> None:
+    """Test the diagnostics report the requests and refreshes."""
+
+    diagnostics = await get_diagnostics_for_config_entry(
+        hass, hass_client, init_integration
+    )
+
+    assert diagnostics["entry"]["data"]["access_token"] == REDACTED
+    coordinator = diagnostics["coordinator"]
+    assert coordinator["last_update_success"] is True
+    assert coordinator["refresh"]["refreshes"] == 1
+    assert coordinator["refresh"]["failures"] == 0
+    assert coordinator["refresh"]["fetched_items"] == 2
+    assert coordinator["refresh"]["last_success"] is not None
+    assert coordinator["lists"] == {"1": {"items": 1, "recent_items": 1}}
+    assert coordinator["queued_changes"] == 0
+
+    connection = diagnostics["connection"]
+    assert connection["circuit"] == "closed"
+    items = connection["requests"]["get_shoppinglist_items"]
+    assert items["requests"] == 1
+    assert items["failures"] == 0
+    assert items["received_entries"] == 1
+    assert sum(items["latency_histogram"].values()) == 1
+    pool = connection["pool"]
+    assert pool["limit_per_host"] == MAX_CONCURRENT_REQUESTS + SESSION_EXTRA_CONNECTIONS
+    assert pool["in_flight"] == 0
@@ -1,9 +1,223 @@
 """Test component setup."""
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import DefaultResolver
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
 from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
 
-from custom_components.kitchenowl.const import DOMAIN
+from custom_components.kitchenowl.const import (
+    CONF_HOUSEHOLD,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    STORAGE_VERSION,
+)
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+async def test_setup_from_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    config_entry: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+) -> None:
+    """Test entities are created from stored data while the server is down."""
+
+    hass_storage[f"{DOMAIN}.{config_entry.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{config_entry.entry_id}",
+        "data": {
+            "lists": [
+                {
+                    "shopping_list": {"id": 1, "name": "Groceries", "household_id": 1},
+                    "items": [
+                        {"id": 7, "name": "Milk", "description": ""},
+                        {"id": 9, "name": "Eggs", "description": ""},
+                    ],
+                    "recent_items": [],
+                }
+            ]
+        },
+    }
+    mock_kitchenowl.test_connection.side_effect = TimeoutError
+
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("todo.groceries").state == "2"
+    mock_kitchenowl.get_shoppinglists.assert_not_called()
+
+
+async def test_snapshot_is_replaced_by_live_data(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    init_integration: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+) -> None:
+    """Test the live data is stored and swapped in after a restart."""
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+    stored = hass_storage[f"{DOMAIN}.{init_integration.entry_id}"]["data"]
+    assert [i["id"] for i in stored["lists"][0]["items"]] == [7]
+
+    mock_kitchenowl.get_shoppinglist_items.return_value = []
+    assert await hass.config_entries.async_reload(init_integration.entry_id)
+    assert hass.states.get("todo.groceries").state == "1"
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert hass.states.get("todo.groceries").state == "0"
+
+
+async def test_entries_share_connection(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test households of the same user share the client and are polled together.
+
+    The session of the connection is closed with the last of them.
+    """
+
+    mock_kitchenowl.get_households.return_value = [
+        {"id": 1, "name": "Home"},
+        {"id": 2, "name": "Cabin"},
+    ]
+    other_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="KitchenOwl Cabin",
+        unique_id="1_2",
+        version=0,
+        minor_version=1,
+        data={**config_entry.data, CONF_HOUSEHOLD: "2"},
+    )
+    for entry in (config_entry, other_entry):
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with patch("custom_components.kitchenowl.KitchenOwl") as kitchenowl_class:
+        assert await hass.config_entries.async_reload(other_entry.entry_id)
+    kitchenowl_class.assert_not_called()
+    assert config_entry.runtime_data.kitchenowl is other_entry.runtime_data.kitchenowl
+
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+    assert sorted(
+        call.args for call in mock_kitchenowl.get_shoppinglists.await_args_list
+    ) == [("1",), ("2",)]
+
+    (connection,) = hass.data[DOMAIN].values()
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    assert len(hass.data[DOMAIN]) == 1
+    assert not connection.session.closed
+    await hass.config_entries.async_unload(other_entry.entry_id)
+    assert not hass.data[DOMAIN]
+    assert connection.session.closed
+
+
+async def test_shared_connection_uses_highest_request_limit(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test the highest request limit of the households of a connection applies."""
+
+    mock_kitchenowl.get_households.return_value = [
+        {"id": 1, "name": "Home"},
+        {"id": 2, "name": "Cabin"},
+    ]
+    other_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="KitchenOwl Cabin",
+        unique_id="1_2",
+        version=0,
+        minor_version=1,
+        data={**config_entry.data, CONF_HOUSEHOLD: "2"},
+        options={CONF_MAX_CONCURRENT_REQUESTS: 6},
+    )
+    for entry in (config_entry, other_entry):
+        entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    (connection,) = hass.data[DOMAIN].values()
+    assert connection.max_concurrent_requests == 6
+
+    hass.config_entries.async_update_entry(
+        other_entry, options={CONF_MAX_CONCURRENT_REQUESTS: 2}
+    )
+    await hass.async_block_till_done()
+    assert connection.session.closed
+    (connection,) = hass.data[DOMAIN].values()
+    assert connection.max_concurrent_requests == MAX_CONCURRENT_REQUESTS
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert other_entry.state is ConfigEntryState.LOADED
+    assert config_entry.runtime_data.kitchenowl is connection.kitchenowl
+    assert other_entry.runtime_data.kitchenowl is connection.kitchenowl
+
+
+async def test_unload_closes_session(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test the session of the connection is closed when the entry is unloaded."""
+
+    (connection,) = hass.data[DOMAIN].values()
+    assert not connection.session.closed
+
+    assert await hass.config_entries.async_unload(init_integration.entry_id)
+    assert init_integration.state is ConfigEntryState.NOT_LOADED
+    assert connection.session.closed
+
+
+async def test_reload_does_not_leak_close_listeners(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test closed sessions no longer listen for Home Assistant to close."""
+
+    listeners = hass.bus.async_listeners()[EVENT_HOMEASSISTANT_CLOSE]
+    for _ in range(3):
+        assert await hass.config_entries.async_reload(init_integration.entry_id)
+    assert hass.bus.async_listeners()[EVENT_HOMEASSISTANT_CLOSE] == listeners
+
+
+async def test_session_is_closed_with_home_assistant(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test the session is closed when Home Assistant closes."""
+
+    (connection,) = hass.data[DOMAIN].values()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert connection.session.closed
+
+
+async def test_setup_without_resolver_of_home_assistant(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test the default resolver is used if Home Assistant has no resolver helper."""
+
+    config_entry.add_to_hass(hass)
+    with patch.object(aiohttp_client, "_async_make_resolver", None):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    (connection,) = hass.data[DOMAIN].values()
+    assert isinstance(connection.session.connector._resolver, DefaultResolver)
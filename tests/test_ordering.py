@@ -0,0 +1,49 @@
+"""Test the order of the open items of a shopping list."""
+
+from custom_components.kitchenowl.models import ShoppingListItem
+from custom_components.kitchenowl.ordering import ItemOrder
+
+
+def _order(*orderings: int | None) -> ItemOrder:
+    return ItemOrder(
+        ShoppingListItem(item_id, f"Item {item_id}", ordering=ordering)
+        for item_id, ordering in enumerate(orderings, start=1)
+    )
+
+
+def test_order_is_updated_incrementally() -> None:
+    """Test items are kept in order as they are added, removed and moved."""
+
+    order = _order(30, 10, None, 20)
+    assert list(order) == [3, 2, 4, 1]
+
+    assert order.remove(2) == 1
+    assert order.add(ShoppingListItem(2, "Item 2", ordering=40)) == 3
+    assert list(order) == [3, 4, 1, 2]
+    assert order.index(1) == 2
+    assert 5 not in order
+
+
+def test_move_into_gap_writes_one_ordering() -> None:
+    """Test a move between items with room in between only writes the item."""
+
+    order = _order(10, 20, 30, 40)
+
+    assert order.plan_move(4, 1) == {4: 14}
+    assert order.plan_move(2, None) == {2: 4}
+    assert order.plan_move(1, 4) == {1: 41}
+    # Ties are broken by id, so an ordering can be shared
+    assert _order(10, 11, 30).plan_move(3, 1) == {3: 10}
+
+
+def test_move_without_gap_shifts_fewest_neighbours() -> None:
+    """Test the side with the fewest items in the way is shifted."""
+
+    # All items without room, e.g. as KitchenOwl creates them
+    order = _order(0, 0, 0, 0)
+    assert order.plan_move(1, 2) == {1: 1, 3: 1, 4: 1}
+    assert order.plan_move(4, None) == {4: 0, 1: 1, 2: 1, 3: 1}
+
+    order = _order(5, 5, 5, 5, 5, 5)
+    assert order.plan_move(1, 3) == {1: 5, 3: 4, 2: 4}
+    assert order.plan_move(6, 4) == {6: 5, 5: 6}
@@ -0,0 +1,238 @@
+"""Test realtime push updates against a local stand-in event server."""
+
+import asyncio
+from datetime import timedelta
+import json
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession, WSMsgType, web
+import pytest
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.kitchenowl.const import (
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    EVENT_ITEM_CHANGED,
+)
+from custom_components.kitchenowl.coordinator import KitchenOwlDataUpdateCoordinator
+from custom_components.kitchenowl.push import (
+    EVENT_SHOPPINGLIST_ITEM_ADD,
+    EVENT_SHOPPINGLIST_ITEM_REMOVE,
+    KitchenOwlPushClient,
+)
+
+TOKEN = "test-token"
+SHOPPING_LIST = {"id": 1, "name": "Groceries", "household_id": 1}
+
+
+class StandInEventServer:
+    """A minimal Socket.IO server emitting KitchenOwl shopping list events."""
+
+    def __init__(self) -> None:
+        """Set up the server."""
+        # Handshakes to send to the next clients before the valid one
+        self.bad_handshakes: list[str] = []
+        self.app = web.Application()
+        self.app.router.add_get("/socket.io/", self._handle)
+        self.runner = web.AppRunner(self.app)
+        self.url = ""
+        self.pong_received = asyncio.Event()
+        self.auth_headers: list[str | None] = []
+        self._clients: list[web.WebSocketResponse] = []
+        self.client_connected = asyncio.Event()
+
+    async def start(self) -> None:
+        """Start listening on a random local port."""
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        await self.runner.cleanup()
+
+    async def emit(self, event: str, data: dict) -> None:
+        """Send an event to all connected clients."""
+        for ws in self._clients:
+            await ws.send_str("42" + json.dumps([event, data]))
+
+    async def ping(self) -> None:
+        """Send an Engine.IO ping to all connected clients."""
+        for ws in self._clients:
+            await ws.send_str("2")
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.auth_headers.append(request.headers.get("Authorization"))
+        if self.bad_handshakes:
+            await ws.send_str(self.bad_handshakes.pop(0))
+            await ws.close()
+            return ws
+        await ws.send_str(
+            '0{"sid":"eio","upgrades":[],"pingInterval":25000,"pingTimeout":20000}'
+        )
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            if msg.data.startswith("40"):
+                if json.loads(msg.data[2:]).get("token") != TOKEN:
+                    await ws.send_str('44{"message":"unauthorized"}')
+                    continue
+                await ws.send_str('40{"sid":"sio"}')
+                self._clients.append(ws)
+                self.client_connected.set()
+            elif msg.data == "3":
+                self.pong_received.set()
+        return ws
+
+
+@pytest.fixture
+async def event_server(socket_enabled):
+    """Run a stand-in event server for the duration of a test."""
+    server = StandInEventServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+async def test_push_client_receives_events(event_server: StandInEventServer) -> None:
+    """Test the client connects, answers pings and dispatches events."""
+
+    events: asyncio.Queue = asyncio.Queue()
+    connection_changes: list[bool] = []
+
+    async with ClientSession() as session:
+        client = KitchenOwlPushClient(
+            session,
+            event_server.url,
+            TOKEN,
+            lambda event, data: events.put_nowait((event, data)),
+            connection_changes.append,
+        )
+        task = asyncio.create_task(client.async_run())
+
+        await asyncio.wait_for(event_server.client_connected.wait(), 5)
+        await event_server.ping()
+        await asyncio.wait_for(event_server.pong_received.wait(), 5)
+        await event_server.emit(
+            EVENT_SHOPPINGLIST_ITEM_ADD,
+            {"item": {"id": 7, "name": "Milk"}, "shoppinglist": SHOPPING_LIST},
+        )
+        event, data = await asyncio.wait_for(events.get(), 5)
+
+        assert client.connected
+        assert event == EVENT_SHOPPINGLIST_ITEM_ADD
+        assert data["item"]["name"] == "Milk"
+        assert event_server.auth_headers == [f"Bearer {TOKEN}"]
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert not client.connected
+    assert connection_changes == [True, False]
+
+
+async def test_push_client_reconnects_after_unexpected_error(
+    event_server: StandInEventServer,
+) -> None:
+    """Test a malformed handshake does not stop the client from reconnecting."""
+
+    event_server.bad_handshakes.append("0{bad json")
+
+    async with ClientSession() as session:
+        connected = asyncio.Event()
+        client = KitchenOwlPushClient(
+            session,
+            event_server.url,
+            TOKEN,
+            lambda event, data: None,
+            lambda _: connected.set(),
+        )
+        with patch("custom_components.kitchenowl.push.PUSH_RECONNECT_MIN_DELAY", 0):
+            task = asyncio.create_task(client.async_run())
+            await asyncio.wait_for(connected.wait(), 5)
+
+        assert client.connected
+        assert not event_server.bad_handshakes
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+async def _setup_coordinator(
+    hass, recent_items_limit: int | None = None
+) -> KitchenOwlDataUpdateCoordinator:
+    kitchenowl = AsyncMock()
+    kitchenowl.get_shoppinglists.return_value = [SHOPPING_LIST]
+    kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Milk", "description": ""}
+    ]
+    kitchenowl.get_shoppinglist_recent_items.return_value = [
+        {"id": 8, "name": "Bread", "description": "whole grain"}
+    ]
+    coordinator = KitchenOwlDataUpdateCoordinator(
+        hass, kitchenowl, "1", recent_items_limit=recent_items_limit
+    )
+    await coordinator.async_refresh()
+    return coordinator
+
+
+async def test_coordinator_applies_push_events(hass) -> None:
+    """Test push events update the coordinator data without polling."""
+
+    coordinator = await _setup_coordinator(hass)
+    kitchenowl = coordinator.kitchenowl
+    kitchenowl.get_shoppinglists.reset_mock()
+    events = async_capture_events(hass, EVENT_ITEM_CHANGED)
+
+    coordinator.async_handle_push_event(
+        EVENT_SHOPPINGLIST_ITEM_ADD,
+        {"item": {"id": 8, "name": "Bread"}, "shoppinglist": SHOPPING_LIST},
+    )
+    coordinator.async_handle_push_event(
+        EVENT_SHOPPINGLIST_ITEM_REMOVE,
+        {"item": {"id": 7, "name": "Milk"}, "shoppinglist": SHOPPING_LIST},
+    )
+
+    list_data = coordinator.data[1]
+    assert [i.id for i in list_data["items"]] == [8]
+    assert [i.id for i in list_data["recent_items"]] == [7]
+    kitchenowl.get_shoppinglists.assert_not_called()
+    # The events come from the server
+    assert [e.data["change"] for e in events if not e.data["pending"]] == [
+        "uncompleted",
+        "description_changed",
+        "completed",
+    ]
+
+
+async def test_push_events_keep_recent_items_limit(hass) -> None:
+    """Test items removed over push do not grow the recent items past the limit."""
+
+    coordinator = await _setup_coordinator(hass, recent_items_limit=1)
+
+    coordinator.async_handle_push_event(
+        EVENT_SHOPPINGLIST_ITEM_REMOVE,
+        {"item": {"id": 7, "name": "Milk"}, "shoppinglist": SHOPPING_LIST},
+    )
+
+    list_data = coordinator.data[1]
+    assert list_data["items"] == []
+    assert [i.id for i in list_data["recent_items"]] == [7]
+    assert list(list_data["item_index"]) == [7]
+
+
+async def test_coordinator_polls_slowly_while_pushing(hass) -> None:
+    """Test polling speeds up again when the push connection is lost."""
+
+    coordinator = await _setup_coordinator(hass)
+
+    coordinator.async_set_push_connected(True)
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_MAX_SCAN_INTERVAL)
+
+    coordinator.async_set_push_connected(False)
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_MIN_SCAN_INTERVAL)
@@ -0,0 +1,108 @@
+"""Test the retries and the circuit breaker around the KitchenOwl client."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from kitchenowl_python.exceptions import KitchenOwlAuthException
+import pytest
+
+from custom_components.kitchenowl.const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    REQUEST_RETRIES,
+)
+from custom_components.kitchenowl.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    KitchenOwlCircuitOpenError,
+    ResilientKitchenOwl,
+)
+
+
+async def test_unreachable_request_is_retried() -> None:
+    """Test a request that timed out is sent again."""
+
+    client = AsyncMock()
+    client.get_households.side_effect = [TimeoutError, [{"id": 1}]]
+    kitchenowl = ResilientKitchenOwl(client)
+
+    assert await kitchenowl.get_households() == [{"id": 1}]
+    assert client.get_households.await_count == 2
+
+
+async def test_auth_error_is_not_retried() -> None:
+    """Test errors of a reachable server are raised right away."""
+
+    client = AsyncMock()
+    client.get_households.side_effect = KitchenOwlAuthException
+    kitchenowl = ResilientKitchenOwl(client)
+
+    with pytest.raises(KitchenOwlAuthException):
+        await kitchenowl.get_households()
+    assert client.get_households.await_count == 1
+    assert kitchenowl.breaker.state == CIRCUIT_CLOSED
+
+
+async def test_circuit_opens_and_probes() -> None:
+    """Test requests are paused after repeated failures until a probe succeeds."""
+
+    client = AsyncMock()
+    client.get_shoppinglists.side_effect = TimeoutError
+    kitchenowl = ResilientKitchenOwl(client)
+
+    while kitchenowl.breaker.state != CIRCUIT_OPEN:
+        with pytest.raises(TimeoutError):
+            await kitchenowl.get_shoppinglists(1)
+    assert client.get_shoppinglists.await_count == CIRCUIT_FAILURE_THRESHOLD
+    assert CIRCUIT_FAILURE_THRESHOLD > REQUEST_RETRIES
+
+    with pytest.raises(KitchenOwlCircuitOpenError):
+        await kitchenowl.get_shoppinglists(1)
+    assert client.get_shoppinglists.await_count == CIRCUIT_FAILURE_THRESHOLD
+
+    client.get_shoppinglists.side_effect = None
+    client.get_shoppinglists.return_value = []
+    with patch(
+        "custom_components.kitchenowl.resilience.time.monotonic",
+        return_value=time.monotonic() + CIRCUIT_RESET_TIMEOUT,
+    ):
+        assert await kitchenowl.get_shoppinglists(1) == []
+    assert kitchenowl.breaker.state == CIRCUIT_CLOSED
+
+
+async def test_cancelled_probe_opens_circuit() -> None:
+    """Test a probe that was cancelled lets the next request probe again."""
+
+    client = AsyncMock()
+    client.get_shoppinglists.side_effect = TimeoutError
+    kitchenowl = ResilientKitchenOwl(client)
+    while kitchenowl.breaker.state != CIRCUIT_OPEN:
+        with pytest.raises(TimeoutError):
+            await kitchenowl.get_shoppinglists(1)
+
+    probe_sent = asyncio.Event()
+
+    async def hang(_household_id: int) -> list:
+        probe_sent.set()
+        await asyncio.Event().wait()
+        return []
+
+    client.get_shoppinglists.side_effect = hang
+    with patch(
+        "custom_components.kitchenowl.resilience.time.monotonic",
+        return_value=time.monotonic() + CIRCUIT_RESET_TIMEOUT,
+    ):
+        task = asyncio.create_task(kitchenowl.get_shoppinglists(1))
+        await probe_sent.wait()
+        assert kitchenowl.breaker.state == CIRCUIT_HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert kitchenowl.breaker.state == CIRCUIT_OPEN
+
+        client.get_shoppinglists.side_effect = None
+        client.get_shoppinglists.return_value = []
+        assert await kitchenowl.get_shoppinglists(1) == []
+    assert kitchenowl.breaker.state == CIRCUIT_CLOSED
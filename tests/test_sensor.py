@@ -0,0 +1,53 @@
+"""Test the KitchenOwl diagnostic sensors."""
+
+from unittest.mock import AsyncMock, patch
+
+from kitchenowl_python.exceptions import KitchenOwlRequestException
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.kitchenowl.sensor import KitchenOwlSensorEntity
+
+
+async def test_sensors_disabled_by_default(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test the diagnostic sensors are not enabled by default."""
+
+    entry = er.async_get(hass).async_get("sensor.kitchenowl_refresh_duration")
+    assert entry is not None
+    assert entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+
+
+async def test_sensors(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+) -> None:
+    """Test the sensors show the statistics, also after a failed refresh."""
+
+    config_entry.add_to_hass(hass)
+    with patch.object(
+        KitchenOwlSensorEntity, "_attr_entity_registry_enabled_default", True
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert float(hass.states.get("sensor.kitchenowl_refresh_duration").state) >= 0
+    assert hass.states.get("sensor.kitchenowl_fetched_items").state == "2"
+    assert hass.states.get("sensor.kitchenowl_requests").state == "5"
+    assert hass.states.get("sensor.kitchenowl_last_failed_refresh").state == (
+        STATE_UNKNOWN
+    )
+
+    mock_kitchenowl.get_shoppinglists.side_effect = KitchenOwlRequestException
+    await config_entry.runtime_data.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.kitchenowl_last_failed_refresh").state != (
+        STATE_UNKNOWN
+    )
+    assert hass.states.get("sensor.kitchenowl_requests").state == "6"
@@ -0,0 +1,562 @@
+"""Test the KitchenOwl todo platform."""
+
+from typing import Any
+from unittest.mock import AsyncMock
+
+from kitchenowl_python.exceptions import KitchenOwlRequestException
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from homeassistant.components.todo import DOMAIN as TODO_DOMAIN, TodoServices
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.kitchenowl.const import (
+    ATTR_COUNT,
+    ATTR_ITEMS,
+    ATTR_QUERY,
+    CONF_RECENT_ITEMS_LIMIT,
+    CONF_RECENT_ITEMS_MAX_AGE,
+    DOMAIN,
+    SERVICE_ADD_ITEMS,
+    SERVICE_LOAD_RECENT_ITEMS,
+    SERVICE_SEARCH_ITEMS,
+)
+from custom_components.kitchenowl.mutations import ACTION_COMPLETE, Mutation
+
+ENTITY_ID = "todo.groceries"
+
+
+async def _get_items(hass: HomeAssistant) -> list[dict]:
+    result = await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.GET_ITEMS,
+        {},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+        return_response=True,
+    )
+    return result[ENTITY_ID]["items"]
+
+
+async def _async_send_mutations(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    await config_entry.runtime_data.batcher.async_flush()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_todo_items(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test open and recent items are shown."""
+
+    assert hass.states.get(ENTITY_ID).state == "1"
+    assert [(i["summary"], i["status"]) for i in await _get_items(hass)] == [
+        ("Milk", "needs_action"),
+        ("Bread", "completed"),
+    ]
+
+
+async def test_complete_item_is_optimistic(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test completing an item shows up before the server is refetched."""
+
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": "7", "status": "completed"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_ID).state == "0"
+
+    await _async_send_mutations(hass, init_integration)
+    mock_kitchenowl.remove_shoppinglist_item.assert_awaited_once_with(
+        list_id=1, item_id=7
+    )
+    mock_kitchenowl.get_shoppinglists.assert_not_called()
+    assert hass.states.get(ENTITY_ID).state == "0"
+
+
+async def test_pending_changes_are_sent_on_unload(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test changes waiting for their batch are sent before the session closes."""
+
+    (connection,) = hass.data[DOMAIN].values()
+    session_closed: list[bool] = []
+
+    async def remove_item(*_: Any) -> bool:
+        session_closed.append(connection.session.closed)
+        return True
+
+    mock_kitchenowl.remove_shoppinglist_item.side_effect = remove_item
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": "7", "status": "completed"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert await hass.config_entries.async_unload(init_integration.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert session_closed == [False]
+    assert connection.session.closed
+
+
+async def test_create_item_reconciles_server_id(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a created item takes the id assigned by the server."""
+
+    mock_kitchenowl.add_shoppinglist_item.return_value = {
+        "id": 9,
+        "name": "Eggs",
+        "description": "",
+    }
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "Eggs"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_ID).state == "2"
+
+    await _async_send_mutations(hass, init_integration)
+    assert [i["uid"] for i in await _get_items(hass)] == ["7", "9", "8"]
+
+
+async def test_failed_mutation_is_rolled_back(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a change is reverted when the server rejects it."""
+
+    mock_kitchenowl.delete_item.side_effect = KitchenOwlRequestException
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.REMOVE_ITEM,
+        {"item": ["7"]},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_ID).state == "0"
+
+    await _async_send_mutations(hass, init_integration)
+    assert hass.states.get(ENTITY_ID).state == "1"
+
+
+async def test_add_items_service(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test many items are added with one batch and a single list refresh."""
+
+    added_ids = iter(range(100, 200))
+    mock_kitchenowl.add_shoppinglist_item.side_effect = lambda list_id, item_name: {
+        "id": next(added_ids),
+        "name": item_name,
+        "description": "",
+    }
+    mock_kitchenowl.get_shoppinglists.reset_mock()
+    mock_kitchenowl.get_shoppinglist_items.reset_mock()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_ADD_ITEMS,
+        {ATTR_ITEMS: ["Eggs", "Butter", "eggs", "Flour"]},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_ID).state == "4"
+
+    await _async_send_mutations(hass, init_integration)
+    assert mock_kitchenowl.add_shoppinglist_item.await_count == 3
+    mock_kitchenowl.get_shoppinglists.assert_not_called()
+    mock_kitchenowl.get_shoppinglist_items.assert_awaited_once_with(1)
+
+
+async def test_repeated_edits_are_coalesced(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test rapid renames of an item only send the last one."""
+
+    for summary in ("Oat milk", "Soy milk", "Almond milk"):
+        await hass.services.async_call(
+            TODO_DOMAIN,
+            TodoServices.UPDATE_ITEM,
+            {"item": "7", "rename": summary},
+            target={ATTR_ENTITY_ID: ENTITY_ID},
+            blocking=True,
+        )
+
+    await _async_send_mutations(hass, init_integration)
+    mock_kitchenowl.update_item.assert_awaited_once_with(
+        item_id=7, item={"id": 7, "name": "Almond milk"}
+    )
+    assert (await _get_items(hass))[0]["summary"] == "Almond milk"
+
+
+async def test_unreachable_changes_are_queued_and_replayed(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test changes made while the server is unreachable are sent later."""
+
+    coordinator = init_integration.runtime_data
+    mock_kitchenowl.add_shoppinglist_item.side_effect = TimeoutError
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "Eggs"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": "7", "status": "completed"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+
+    # Completing Milk waits behind the queued item instead of being sent
+    mock_kitchenowl.remove_shoppinglist_item.assert_not_called()
+    assert [(i["summary"], i["status"]) for i in await _get_items(hass)] == [
+        ("Eggs", "needs_action"),
+        ("Milk", "completed"),
+        ("Bread", "completed"),
+    ]
+    stored = hass_storage[f"{DOMAIN}.{init_integration.entry_id}.queue"]["data"]
+    assert [m["action"] for m in stored["mutations"]] == ["add", "complete"]
+
+    mock_kitchenowl.add_shoppinglist_item.side_effect = None
+    mock_kitchenowl.add_shoppinglist_item.return_value = {
+        "id": 9,
+        "name": "Eggs",
+        "description": "",
+    }
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    mock_kitchenowl.add_shoppinglist_item.assert_awaited_with(
+        list_id=1, item_name="Eggs", item_description=""
+    )
+    mock_kitchenowl.remove_shoppinglist_item.assert_awaited_once_with(
+        list_id=1, item_id=7
+    )
+    assert not coordinator.offline_queue.active
+
+
+async def test_local_items_are_not_stored_in_snapshot(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    mock_kitchenowl: AsyncMock,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test items the server has not created yet are left out of the snapshot."""
+
+    mock_kitchenowl.add_shoppinglist_item.side_effect = TimeoutError
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "Eggs"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+    (eggs,) = [i for i in await _get_items(hass) if i["summary"] == "Eggs"]
+    init_integration.runtime_data.async_mutate(
+        1, [Mutation(action=ACTION_COMPLETE, list_id=1, item_id=int(eggs["uid"]))]
+    )
+    assert (await _get_items(hass))[-2:] == [
+        {"summary": "Eggs", "uid": "-1", "status": "completed", "description": ""},
+        {
+            "summary": "Bread",
+            "uid": "8",
+            "status": "completed",
+            "description": "whole grain",
+        },
+    ]
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+
+    (stored,) = hass_storage[f"{DOMAIN}.{init_integration.entry_id}"]["data"]["lists"]
+    assert [i["id"] for i in stored["items"]] == [7]
+    assert [i["id"] for i in stored["recent_items"]] == [8]
+
+
+async def test_update_queued_local_item(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test an item the server has not created yet can be updated."""
+
+    mock_kitchenowl.add_shoppinglist_item.side_effect = TimeoutError
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "Eggs"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": "Eggs", "status": "completed"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+
+    (eggs,) = [i for i in await _get_items(hass) if i["summary"] == "Eggs"]
+    assert eggs == {
+        "summary": "Eggs",
+        "uid": "-1",
+        "status": "completed",
+        "description": "",
+    }
+    assert init_integration.runtime_data.offline_queue.active
+
+
+async def test_queued_change_conflicting_with_server_is_dropped(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a queued rename is dropped if the item was renamed on the server."""
+
+    coordinator = init_integration.runtime_data
+    mock_kitchenowl.update_item.side_effect = TimeoutError
+
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.UPDATE_ITEM,
+        {"item": "7", "rename": "Oat milk"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+    assert coordinator.offline_queue.active
+
+    mock_kitchenowl.update_item.reset_mock(side_effect=True)
+    mock_kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Soy milk", "description": ""}
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    mock_kitchenowl.update_item.assert_not_awaited()
+    assert not coordinator.offline_queue.active
+    assert (await _get_items(hass))[0]["summary"] == "Soy milk"
+
+
+async def test_recent_items_are_limited_and_loaded_on_demand(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test only the newest recent items are shown until more are loaded."""
+
+    now = dt_util.utcnow().timestamp() * 1000
+    day = 24 * 60 * 60 * 1000
+    mock_kitchenowl.get_shoppinglist_recent_items.return_value = [
+        {"id": 8, "name": "Bread", "description": "", "updated_at": now},
+        {"id": 9, "name": "Eggs", "description": "", "updated_at": now - day},
+        {"id": 10, "name": "Flour", "description": "", "updated_at": now - 2 * day},
+        {"id": 11, "name": "Salt", "description": "", "updated_at": now - 40 * day},
+    ]
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_RECENT_ITEMS_LIMIT: 2, CONF_RECENT_ITEMS_MAX_AGE: 30},
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert [i["summary"] for i in await _get_items(hass)] == ["Milk", "Bread", "Eggs"]
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_LOAD_RECENT_ITEMS,
+        {ATTR_COUNT: 1},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert len(await _get_items(hass)) == 4
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_LOAD_RECENT_ITEMS,
+        {},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    assert len(await _get_items(hass)) == 5
+
+
+async def test_recent_items_are_not_fetched_if_none_are_shown(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test the recent items are not requested with a limit of 0."""
+
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_RECENT_ITEMS_LIMIT: 0}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert [i["summary"] for i in await _get_items(hass)] == ["Milk"]
+    mock_kitchenowl.get_shoppinglist_recent_items.assert_not_called()
+
+
+async def test_lists_are_added_and_removed(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test entities follow the lists of the household without a reload."""
+
+    coordinator = init_integration.runtime_data
+    mock_kitchenowl.get_shoppinglists.return_value = [
+        {"id": 1, "name": "Groceries", "household_id": 1},
+        {"id": 2, "name": "Hardware", "household_id": 1},
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(ENTITY_ID).state == "1"
+    assert hass.states.get("todo.hardware").state == "1"
+
+    mock_kitchenowl.get_shoppinglists.return_value = [
+        {"id": 2, "name": "Hardware", "household_id": 1},
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(ENTITY_ID) is None
+    assert er.async_get(hass).async_get(ENTITY_ID) is None
+    assert hass.states.get("todo.hardware").state == "1"
+    assert init_integration.state is ConfigEntryState.LOADED
+
+
+async def test_search_items_service(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test known items are found without asking the server."""
+
+    result = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SEARCH_ITEMS,
+        {ATTR_QUERY: "bred"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert result[ENTITY_ID] == {
+        "items": [{"name": "Bread", "id": 8, "match": "fuzzy", "score": 0.889}]
+    }
+
+
+async def test_add_item_reuses_known_name(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_kitchenowl: AsyncMock
+) -> None:
+    """Test a name differing only in case and spacing adds the known item.
+
+    Similar names are added as they are, they may be a different product.
+    """
+
+    mock_kitchenowl.add_shoppinglist_item.return_value = {
+        "id": 8,
+        "name": "Bread",
+        "description": "whole grain",
+    }
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "  bread"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+
+    mock_kitchenowl.add_shoppinglist_item.assert_awaited_once_with(1, "Bread", "")
+    assert [i["summary"] for i in await _get_items(hass)] == ["Milk", "Bread"]
+
+    mock_kitchenowl.add_shoppinglist_item.reset_mock()
+    mock_kitchenowl.add_shoppinglist_item.return_value = {
+        "id": 9,
+        "name": "Breads",
+        "description": "",
+    }
+    await hass.services.async_call(
+        TODO_DOMAIN,
+        TodoServices.ADD_ITEM,
+        {"item": "Breads"},
+        target={ATTR_ENTITY_ID: ENTITY_ID},
+        blocking=True,
+    )
+    await _async_send_mutations(hass, init_integration)
+
+    mock_kitchenowl.add_shoppinglist_item.assert_awaited_once_with(1, "Breads", "")
+
+
+async def test_move_item_writes_only_the_moved_item(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    mock_kitchenowl: AsyncMock,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test a move is shown right away and only sends the moved item."""
+
+    mock_kitchenowl.get_shoppinglist_items.return_value = [
+        {"id": 7, "name": "Milk", "description": "", "ordering": 10},
+        {"id": 9, "name": "Eggs", "description": "", "ordering": 20},
+        {"id": 10, "name": "Butter", "description": "", "ordering": 30},
+    ]
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": "todo/item/move",
+            "entity_id": ENTITY_ID,
+            "uid": "10",
+            "previous_uid": "7",
+        }
+    )
+    assert (await client.receive_json())["success"]
+    assert [i["summary"] for i in await _get_items(hass)] == [
+        "Milk",
+        "Butter",
+        "Eggs",
+        "Bread",
+    ]
+
+    await _async_send_mutations(hass, config_entry)
+    mock_kitchenowl.update_item.assert_awaited_once_with(
+        item_id=10, item={"id": 10, "name": "Butter", "ordering": 14}
+    )
+
+    await client.send_json_auto_id(
+        {"type": "todo/item/move", "entity_id": ENTITY_ID, "uid": "8"}
+    )
+    response = await client.receive_json()
+    assert not response["success"]